@@ -0,0 +1,110 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from dialect import Dialect
+from evaluator import Evaluator
+from interpreter import Interpreter
+from numerals import decode
+
+WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def shared_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(WORKERS, thread_name_prefix='lab1-evaluate')
+        return _executor
+
+
+def evaluate_chunk(evaluator, nodes):
+    return [evaluator.evaluate(node) for node in nodes]
+
+
+class Session:
+    def __init__(self, settings='', dialect=None, input_provider=None, memo=None, **options):
+        if dialect is None:
+            dialect = Dialect.parse(settings.splitlines())
+        options.setdefault('base_assign', 10)
+        self.lock = threading.RLock()
+        self.input_provider = input_provider
+        self.outputs = []
+        self.interpreter = Interpreter(dialect, **options)
+        self.interpreter.read_input = self.read_input
+        self.interpreter.write_output = self.write_output
+        if memo is not None:
+            self.interpreter.use_memo(memo)
+
+    def read_input(self, name):
+        interpreter = self.interpreter
+        if interpreter.inputs is None:
+            if self.input_provider is None:
+                raise ValueError("Недостаточно входных данных для " + name)
+            value = self.input_provider(name)
+        else:
+            value = next(interpreter.inputs, None)
+        if value is None:
+            raise ValueError("Недостаточно входных данных для " + name)
+        if isinstance(value, str):
+            return decode(value, interpreter.base_input)
+        if not isinstance(value, int):
+            raise TypeError(f"Недопустимое входное значение для {name}: {value!r}")
+        return value
+
+    def write_output(self, label, value):
+        self.outputs.append((label, value))
+
+    def run(self, program, inputs=None):
+        with self.lock:
+            interpreter = self.interpreter
+            interpreter.inputs = iter(inputs) if inputs is not None else None
+            self.outputs = []
+            try:
+                interpreter.execute(program)
+                return self.outputs
+            finally:
+                interpreter.inputs = None
+
+    def parse_expression(self, text):
+        return self.interpreter.parser.parse_expression(text)
+
+    def evaluate(self, text):
+        with self.lock:
+            return self.interpreter.evaluator.evaluate(self.parse_expression(text))
+
+    def evaluate_many(self, texts, workers=None):
+        with self.lock:
+            nodes = [self.parse_expression(text) for text in texts]
+            workers = min(workers or WORKERS, len(nodes))
+            if workers < 2:
+                return evaluate_chunk(self.interpreter.evaluator, nodes)
+            evaluator = Evaluator(self.interpreter.variables)
+            size = -(-len(nodes) // workers)
+            executor = shared_executor()
+            futures = [executor.submit(evaluate_chunk, evaluator, nodes[start:start + size])
+                       for start in range(0, len(nodes), size)]
+            wait(futures)
+            results = []
+            for future in futures:
+                results.extend(future.result())
+            return results
+
+    def get(self, name):
+        with self.lock:
+            return self.interpreter.variables.search(name)
+
+    def set(self, name, value):
+        with self.lock:
+            self.interpreter.variables.insert(name, value)
+
+    def delete(self, name):
+        with self.lock:
+            self.interpreter.variables.delete(name)
+
+    def variables(self):
+        with self.lock:
+            return dict(self.interpreter.variables.items(ordered=True))
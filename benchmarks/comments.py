@@ -0,0 +1,55 @@
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from source import scan, strip_nested_comments
+
+
+def regex_strip(text):
+    pattern = r'\[([^\[\]]*?)\]'
+    while re.search(pattern, text):
+        text = re.sub(pattern, '', text)
+    return text
+
+
+def nested(depth, width=1):
+    body = ' x ' * width
+    return 'a = 1; ' + '[' * depth + body + ']' * depth + ' output(a);'
+
+
+def siblings(depth, count):
+    return 'a = 1; ' + ''.join('[' * depth + 'c' + ']' * depth + ' b = a;' for _ in range(count))
+
+
+def measure(function, text, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(text)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def main():
+    cases = []
+    for depth in (10, 100, 1000, 5000):
+        cases.append((f'nested depth={depth}', nested(depth)))
+    for depth in (10, 100):
+        cases.append((f'siblings depth={depth} x1000', siblings(depth, 1000)))
+
+    print(f'{"case":32} {"regex":>10} {"linear":>10} {"scan":>10}')
+    for name, text in cases:
+        assert regex_strip(text) == strip_nested_comments(text)
+        old = measure(regex_strip, text, 1)
+        new = measure(strip_nested_comments, text)
+        whole = measure(scan, text)
+        print(f'{name:32} {old * 1000:9.2f}ms {new * 1000:9.2f}ms {whole * 1000:9.2f}ms')
+
+
+if __name__ == '__main__':
+    main()
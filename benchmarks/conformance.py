@@ -0,0 +1,620 @@
+import io
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generate import VARIANTS, settings_text, formatter, random_expression, nested_comment
+from dialect import Dialect
+from interpreter import Interpreter
+from lexer import ParseError
+from frontend import Number, Variable, UnaryOp, BinaryOp, Assign, Input, Output, format_number
+from output import OutputSink
+from source import read_chunks, read_statements
+from vectorized import np
+
+ENGINES = ('tree', 'optimized', 'codegen', 'optimized+codegen', 'memo', 'stream', 'batch')
+NAMES = tuple(f'v{i}' for i in range(6))
+BASES = (10, 16, 8, 2)
+COMMANDS = ('not', 'input', 'output', 'add', 'mult', 'sub', 'pow', 'div', 'rem', 'xor', 'and', 'or', '=')
+MEMO_SIZE = 64
+SHRINK_LIMIT = 2000
+FAULT_RATE = 0.5
+FAULTS = 0.05
+REPEAT_RATE = 0.3
+REPEAT_OPERATORS = ('add', 'sub', 'mult', 'xor', 'and', 'or')
+LITERAL = re.compile(r'(?<!\w)\d+(?!\w)')
+
+EXPECTED = {
+    'reparse': "with base_assign != 10 the reference re-reads the decimal digits of every intermediate result "
+               "in base_assign, while the AST engines keep native ints (user-001): program.txt at base-assign=16 "
+               "prints Var3 = 400 instead of 16723. The reference runs the decimal rendering of such cases "
+               "at base_assign=10, and its output labels are spelled back in base_assign",
+    'infix-order': "in (op) infix the reference evaluates each parenthesised group while it tokenizes, before the "
+                   "plain operands around it, so with several failing operands it can report another error than "
+                   "left-to-right evaluation. When the reference raises on such a case, an engine error is accepted "
+                   "if the reference raises it on the same program written in call syntax, which it evaluates "
+                   "left to right",
+    'malformed': "a program written in another dialect than its settings is rejected by the frontend before it "
+                 "runs (user-001), while the reference splits each statement on '=' and checks it only when it "
+                 "gets there: it reports runtime errors of earlier statements first, and it accepts a number or "
+                 "input() as an assignment target or crashes with IndexError. A statement is malformed when the "
+                 "reference, run on it alone at base_assign=10 with every variable defined, behaves differently than on the same "
+                 "statement written in the settings dialect; an engine ParseError is accepted at the first "
+                 "malformed line",
+}
+
+
+class Case:
+    def __init__(self, variant, statements, decorations, inputs, foreign=None, base_assign=10):
+        self.variant = variant
+        self.statements = statements
+        self.decorations = decorations
+        self.inputs = inputs
+        self.foreign = foreign
+        self.base_assign = base_assign
+
+    def replace(self, statements=None, decorations=None, inputs=None):
+        return Case(self.variant,
+                    self.statements if statements is None else statements,
+                    self.decorations if decorations is None else decorations,
+                    self.inputs if inputs is None else inputs,
+                    self.foreign, self.base_assign)
+
+    def settings(self):
+        return settings_text(self.variant)
+
+    def dialect(self):
+        return Dialect.parse(self.settings().splitlines())
+
+    def native(self):
+        return Case(self.variant, self.statements, self.decorations, self.inputs, None, self.base_assign)
+
+    def render(self, base_assign=None, calls=False):
+        writer = formatter(self.foreign or self.variant, base_assign or self.base_assign)
+        if calls:
+            writer.binary_syntax = writer.unary_syntax
+        texts = []
+        for statement in self.statements:
+            if type(statement) is Input:
+                texts.append(input_statement(writer, statement))
+            else:
+                texts.append(writer.statement(statement))
+        return texts
+
+    def program(self, base_assign=None, calls=False):
+        lines = [prefix + text + ';' + suffix
+                 for text, (prefix, suffix) in zip(self.render(base_assign, calls), self.decorations)]
+        if lines:
+            lines[-1] = lines[-1][:lines[-1].rindex(';') + 1]
+        return '\n'.join(lines) + '\n'
+
+    def columns(self):
+        return {statement.target: [value] for statement, value in
+                zip((statement for statement in self.statements if type(statement) is Input), self.inputs)}
+
+    def size(self):
+        return len(self.statements)
+
+    def lines(self):
+        numbers = []
+        line = 1
+        for prefix, suffix in self.decorations:
+            numbers.append(line + prefix.count('\n'))
+            line = numbers[-1] + 1
+        return numbers
+
+    def expected(self):
+        differences = []
+        if self.foreign is not None and self.render() != self.native().render():
+            differences.append('malformed')
+        if not any(type(statement) is not Input and type(statement.expr) in (UnaryOp, BinaryOp)
+                   for statement in self.statements):
+            return differences
+        if self.base_assign != 10:
+            differences.append('reparse')
+        written = VARIANTS[self.foreign or self.variant]
+        if VARIANTS[self.variant][2] == '(op)' and written[1:3] == VARIANTS[self.variant][1:3]:
+            differences.append('infix-order')
+        return differences
+
+
+def input_statement(writer, statement):
+    expr = writer.name('input') + '()'
+    if writer.result_placement == 'right':
+        return f'{expr} {writer.name("=")} {statement.target}'
+    return f'{statement.target} {writer.name("=")} {expr}'
+
+
+class Outcome:
+    def __init__(self, outputs, variables, error):
+        self.outputs = outputs
+        self.variables = variables
+        self.error = error
+
+    def kind(self):
+        if self.error is None:
+            return None
+        if isinstance(self.error, ValueError):
+            return 'ValueError'
+        return type(self.error).__name__
+
+    def message(self):
+        return getattr(self.error, 'message', str(self.error))
+
+    def describe(self):
+        if self.error is not None:
+            return f'{type(self.error).__name__}: {self.error}'
+        return f'outputs={self.outputs} variables={self.variables}'
+
+
+def subexpressions(node, found):
+    kind = type(node)
+    if kind is BinaryOp:
+        found.append(node)
+        subexpressions(node.left, found)
+        subexpressions(node.right, found)
+    elif kind is UnaryOp:
+        found.append(node)
+        subexpressions(node.operand, found)
+    return found
+
+
+def generate_case(rng, statements, depth, foreign_rate=0.0, comment_rate=0.2, fault_rate=FAULT_RATE):
+    variant = rng.choice(list(VARIANTS))
+    base_assign = 10 if rng.random() < 0.5 else rng.choice(BASES[1:])
+    faults = FAULTS if rng.random() < fault_rate else 0.0
+    defined = []
+    result = []
+    decorations = []
+    inputs = []
+    repeated = []
+
+    def expression():
+        expr = random_expression(rng, depth, defined, faults, [name for name in NAMES if name not in defined])
+        if repeated and rng.random() < REPEAT_RATE:
+            expr = BinaryOp(rng.choice(REPEAT_OPERATORS), expr, rng.choice(repeated))
+        subexpressions(expr, repeated)
+        return expr
+
+    for _ in range(statements):
+        roll = rng.random()
+        if roll < 0.1 and len(inputs) < len(NAMES):
+            target = rng.choice([name for name in NAMES if name not in (s.target for s in result if type(s) is Input)])
+            statement = Input(target)
+            inputs.append(rng.choice((0, 1, rng.randrange(100), rng.getrandbits(32))))
+        elif roll < 0.25 and defined:
+            statement = Output(expression(), '')
+        else:
+            target = rng.choice(NAMES)
+            statement = Assign(target, expression())
+        if type(statement) is not Output and statement.target not in defined:
+            defined.append(statement.target)
+        result.append(statement)
+        prefix = nested_comment(rng, rng.randrange(1, 3)) if rng.random() < comment_rate else ''
+        suffix = ' # comment' if rng.random() < comment_rate else ''
+        decorations.append((prefix, suffix))
+    foreign = rng.choice(list(VARIANTS)) if rng.random() < foreign_rate else None
+    return Case(variant, result, decorations, inputs, foreign, base_assign)
+
+
+def capture(interpreter, outputs):
+    interpreter.write_output = lambda label, value: outputs.append((label, value))
+    interpreter.output = OutputSink(io.StringIO())
+
+
+def finish(interpreter, outputs, error):
+    variables = dict(interpreter.variables.items(ordered=True))
+    return Outcome(outputs, variables, error)
+
+
+def reference_settings(text):
+    commands = {name: name for name in COMMANDS}
+    syntax = {'result_placement': 'left', 'unary_syntax': 'op()', 'binary_syntax': 'op()'}
+    for line in text.splitlines():
+        line = line.strip().lower()
+        if not line or line.startswith('#'):
+            continue
+        if line == 'left=':
+            syntax['result_placement'] = 'left'
+        elif line == 'right=':
+            syntax['result_placement'] = 'right'
+        elif line in ['op()', '()op']:
+            syntax['binary_syntax'] = line
+            syntax['unary_syntax'] = line
+        elif line == '(op)':
+            syntax['binary_syntax'] = line
+        else:
+            parts = line.split()
+            if len(parts) == 2:
+                commands[parts[0]] = parts[1]
+            elif len(parts) == 3 and parts[0] == '[':
+                commands[parts[1]] = parts[2].rstrip(']')
+    return commands, syntax
+
+
+def reference_translate(commands, line):
+    for original, synonym in commands.items():
+        if synonym + '(' in line or ')' + synonym in line or ' ' + synonym + ' ' in line:
+            line = line.replace(synonym, original)
+    return line
+
+
+def run_reference(case, dialect, program, expected=True, calls=False, defined=()):
+    base_assign = case.base_assign
+    reparse = expected and 'reparse' in case.expected()
+    if reparse:
+        base_assign = 10
+    if reparse or calls:
+        program = case.program(base_assign, calls)
+    commands, syntax = reference_settings(case.settings())
+    if calls:
+        syntax['binary_syntax'] = syntax['unary_syntax']
+    interpreter = Interpreter(Dialect(), base_assign=base_assign)
+    for name, value in syntax.items():
+        setattr(interpreter, name, value)
+    interpreter.translate = lambda line: reference_translate(commands, line)
+    for name in defined:
+        interpreter.variables.insert(name, 1)
+    outputs = []
+    capture(interpreter, outputs)
+    interpreter.inputs = iter(case.inputs)
+    error = None
+    try:
+        for line in program.split(';'):
+            line = interpreter.remove_nested_comments(line.strip())
+            if line:
+                interpreter.process_line(interpreter.remove_comments(line))
+    except Exception as e:
+        error = e
+    if reparse:
+        outputs[:] = [(LITERAL.sub(lambda match: format_number(int(match.group()), case.base_assign), label), value)
+                      for label, value in outputs]
+    return finish(interpreter, outputs, error)
+
+
+def run_interpreter(case, dialect, program, optimize=False, codegen=False, memo=False, stream=False):
+    interpreter = Interpreter(dialect, base_assign=case.base_assign, optimize=optimize, codegen=codegen)
+    outputs = []
+    capture(interpreter, outputs)
+    interpreter.inputs = iter(case.inputs)
+    if memo:
+        interpreter.use_memo(MEMO_SIZE)
+    error = None
+    try:
+        if stream:
+            interpreter.execute_stream(read_statements(read_chunks(io.StringIO(program))))
+        else:
+            interpreter.execute(program)
+    except Exception as e:
+        error = e
+    return finish(interpreter, outputs, error)
+
+
+def run_batch(case, dialect, program):
+    interpreter = Interpreter(dialect, base_assign=case.base_assign)
+    error = None
+    outputs = []
+    try:
+        for label, column in interpreter.execute_batch(program, case.columns()):
+            outputs.append((label, int(column[0])))
+    except Exception as e:
+        error = e
+    return Outcome(outputs, None, error)
+
+
+RUNNERS = {
+    'reference': run_reference,
+    'tree': run_interpreter,
+    'optimized': lambda case, dialect, program: run_interpreter(case, dialect, program, optimize=True),
+    'codegen': lambda case, dialect, program: run_interpreter(case, dialect, program, codegen=True),
+    'optimized+codegen': lambda case, dialect, program: run_interpreter(case, dialect, program, True, True),
+    'memo': lambda case, dialect, program: run_interpreter(case, dialect, program, memo=True),
+    'stream': lambda case, dialect, program: run_interpreter(case, dialect, program, stream=True),
+    'batch': run_batch,
+}
+
+
+def run_engine(engine, case):
+    return RUNNERS[engine](case, case.dialect(), case.program())
+
+
+def same(reference, outcome):
+    if reference.kind() != outcome.kind():
+        return False
+    if reference.error is not None:
+        return reference.message() == outcome.message()
+    if reference.outputs != outcome.outputs:
+        return False
+    return outcome.variables is None or reference.variables == outcome.variables
+
+
+def malformed_line(case):
+    isolated = Case(case.variant, case.statements, case.decorations, [0], case.foreign)
+    for text, native, line in zip(isolated.render(), isolated.native().render(), case.lines()):
+        if text != native and not same(run_reference(isolated, None, native + ';', False, defined=NAMES),
+                                      run_reference(isolated, None, text + ';', False, defined=NAMES)):
+            return line
+    return None
+
+
+def run_references(case, dialect, program):
+    reference = run_reference(case, dialect, program)
+    ordered = None
+    malformed = None
+    expected = case.expected()
+    if reference.error is not None and 'infix-order' in expected:
+        ordered = run_reference(case, dialect, program, calls=True)
+    if 'malformed' in expected:
+        malformed = malformed_line(case)
+    return reference, ordered, malformed
+
+
+def agrees(reference, ordered, malformed, outcome):
+    if same(reference, outcome):
+        return True
+    if ordered is not None and outcome.error is not None and same(ordered, outcome):
+        return True
+    return malformed is not None and isinstance(outcome.error, ParseError) and outcome.error.line == malformed
+
+
+def diverges(engine, case):
+    reference, ordered, malformed = run_references(case, case.dialect(), case.program())
+    return not agrees(reference, ordered, malformed, run_engine(engine, case))
+
+
+def simplifications(node):
+    kind = type(node)
+    if kind is Number:
+        for value in (0, 1):
+            if node.value > value:
+                yield Number(value)
+        if node.value > 2:
+            yield Number(node.value // 2)
+        return
+    if kind is Variable:
+        yield Number(1)
+        return
+    if kind is UnaryOp:
+        yield node.operand
+        for operand in simplifications(node.operand):
+            yield UnaryOp(node.op, operand)
+        return
+    yield node.left
+    yield node.right
+    yield Number(1)
+    for left in simplifications(node.left):
+        yield BinaryOp(node.op, left, node.right)
+    for right in simplifications(node.right):
+        yield BinaryOp(node.op, node.left, right)
+
+
+def with_expression(statement, expr):
+    if type(statement) is Assign:
+        return Assign(statement.target, expr)
+    return Output(expr, statement.label)
+
+
+def drop_statements(case, keeps):
+    chunk = max(1, case.size() // 2)
+    while chunk >= 1:
+        start = 0
+        while start < case.size():
+            candidate = remove_range(case, start, start + chunk)
+            if candidate.size() and keeps(candidate):
+                case = candidate
+            else:
+                start += chunk
+        chunk //= 2
+    return case
+
+
+def drop_decorations(case, keeps):
+    for index in range(case.size()):
+        if case.decorations[index] != ('', ''):
+            decorations = list(case.decorations)
+            decorations[index] = ('', '')
+            candidate = case.replace(decorations=decorations)
+            if keeps(candidate):
+                case = candidate
+    return case
+
+
+def reduce_inputs(case, keeps):
+    for index in range(len(case.inputs)):
+        for value in (0, 1):
+            if case.inputs[index] > value:
+                inputs = list(case.inputs)
+                inputs[index] = value
+                candidate = case.replace(inputs=inputs)
+                if keeps(candidate):
+                    case = candidate
+                    break
+    return case
+
+
+def simplify_expressions(case, keeps):
+    for index in range(case.size()):
+        statement = case.statements[index]
+        if type(statement) is Input:
+            continue
+        progress = True
+        while progress:
+            progress = False
+            for expr in simplifications(statement.expr):
+                statements = list(case.statements)
+                statements[index] = with_expression(statement, expr)
+                candidate = case.replace(statements=statements)
+                if keeps(candidate):
+                    case = candidate
+                    statement = statements[index]
+                    progress = True
+                    break
+    return case
+
+
+def shrink(engine, case, limit=SHRINK_LIMIT):
+    attempts = 0
+
+    def keeps(candidate):
+        nonlocal attempts
+        if attempts >= limit:
+            return False
+        attempts += 1
+        return diverges(engine, candidate)
+
+    while True:
+        reduced = case
+        for step in (drop_statements, drop_decorations, reduce_inputs, simplify_expressions):
+            reduced = step(reduced, keeps)
+        if reduced is case or attempts >= limit:
+            return reduced
+        case = reduced
+
+
+def remove_range(case, start, end):
+    removed = case.statements[start:end]
+    inputs = list(case.inputs)
+    position = sum(1 for statement in case.statements[:start] if type(statement) is Input)
+    count = sum(1 for statement in removed if type(statement) is Input)
+    del inputs[position:position + count]
+    return Case(case.variant, case.statements[:start] + case.statements[end:],
+                case.decorations[:start] + case.decorations[end:], inputs, case.foreign, case.base_assign)
+
+
+def write_reproducer(directory, name, case):
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.join(directory, name)
+    with open(stem + '.settings.txt', 'w') as file:
+        file.write(case.settings())
+    with open(stem + '.txt', 'w') as file:
+        file.write(case.program())
+    with open(stem + '.in', 'w') as file:
+        file.write(''.join(f'{value}\n' for value in case.inputs))
+    return stem
+
+
+def run_harness(cases, seed, engines, statements, depth, foreign_rate, reproducers=None, shrinking=True,
+                fault_rate=FAULT_RATE):
+    rng = random.Random(seed)
+    seconds = {engine: 0.0 for engine in ('reference',) + engines}
+    executed = {engine: 0 for engine in seconds}
+    failures = {engine: [] for engine in engines}
+    expected = {name: [0, 0] for name in EXPECTED}
+    for number in range(cases):
+        case = generate_case(rng, rng.randrange(1, statements + 1), depth, foreign_rate, fault_rate=fault_rate)
+        dialect = case.dialect()
+        program = case.program()
+        outcomes = {}
+        for engine in seconds:
+            start = time.perf_counter()
+            outcomes[engine] = RUNNERS[engine](case, dialect, program)
+            seconds[engine] += time.perf_counter() - start
+            executed[engine] += case.size()
+        reference = outcomes['reference']
+        ordered = None
+        malformed = None
+        for name in case.expected():
+            expected[name][0] += 1
+            if name == 'reparse':
+                expected[name][1] += not same(reference, run_reference(case, dialect, program, False))
+            elif name == 'malformed':
+                malformed = malformed_line(case)
+                expected[name][1] += malformed is not None
+            elif reference.error is not None:
+                ordered = run_reference(case, dialect, program, calls=True)
+                expected[name][1] += not same(reference, ordered)
+        divergent = [engine for engine in engines if not agrees(reference, ordered, malformed, outcomes[engine])]
+        if not divergent:
+            continue
+        reduced = shrink(divergent[0], case) if shrinking else case
+        reference, ordered, malformed = run_references(reduced, reduced.dialect(), reduced.program())
+        print(f'--- case {number} (seed {seed}): {", ".join(divergent)} '
+              f'{"differs" if len(divergent) == 1 else "differ"} from reference, '
+              f'{case.size()} -> {reduced.size()} statements, dialect {reduced.variant}'
+              + (f', written as {reduced.foreign}' if reduced.foreign else '')
+              + f', base_assign {reduced.base_assign}')
+        print(reduced.program(), end='')
+        if reduced.inputs:
+            print(f'inputs: {reduced.inputs}')
+        print(f'reference: {reference.describe()}')
+        if ordered is not None:
+            print(f'reference in call syntax: {ordered.describe()}')
+        if malformed is not None:
+            print(f'first malformed line: {malformed}')
+        for engine in divergent:
+            failures[engine].append(reduced)
+            outcome = run_engine(engine, reduced)
+            print(f'{engine}: {outcome.describe()}' + ('' if not agrees(reference, ordered, malformed, outcome) else
+                                                        ' (matches after shrinking)'))
+        if reproducers:
+            stem = write_reproducer(reproducers, f'case-{seed}-{number}', reduced)
+            print(f'saved to {stem}.txt')
+    return seconds, executed, failures, expected
+
+
+def report(seconds, executed, failures, cases, expected=None):
+    print(f'{"engine":20} {"mismatches":>10} {"statements/s":>14} {"speedup":>8}')
+    reference = executed['reference'] / seconds['reference'] if seconds['reference'] else 0.0
+    for engine, elapsed in seconds.items():
+        rate = executed[engine] / elapsed if elapsed else 0.0
+        mismatches = len(failures.get(engine, ()))
+        speedup = rate / reference if reference else 0.0
+        print(f'{engine:20} {mismatches:>10} {rate:>14.0f} {speedup:>7.2f}x')
+    print(f'{cases} cases, {len({id(case) for found in failures.values() for case in found})} divergent')
+    for name, (applied, changed) in (expected or {}).items():
+        print(f'expected difference {name}: {applied} cases, {changed} change the reference result')
+        print(f'    {EXPECTED[name]}')
+
+
+def main():
+    argv = sys.argv
+    cases = 200
+    seed = 0
+    engines = ENGINES
+    statements = 20
+    depth = 3
+    foreign_rate = 0.0
+    fault_rate = FAULT_RATE
+    reproducers = None
+    shrinking = '--no-shrink' not in argv
+    for arg in argv[1:]:
+        if arg.startswith('--cases='):
+            cases = int(arg.split('=', 1)[1])
+        elif arg.startswith('--seed='):
+            seed = int(arg.split('=', 1)[1])
+        elif arg.startswith('--engines='):
+            engines = tuple(arg.split('=', 1)[1].split(','))
+        elif arg.startswith('--statements='):
+            statements = int(arg.split('=', 1)[1])
+        elif arg.startswith('--depth='):
+            depth = int(arg.split('=', 1)[1])
+        elif arg.startswith('--foreign='):
+            foreign_rate = float(arg.split('=', 1)[1])
+        elif arg.startswith('--faults='):
+            fault_rate = float(arg.split('=', 1)[1])
+        elif arg.startswith('--reproducers='):
+            reproducers = arg.split('=', 1)[1]
+        elif arg != '--no-shrink':
+            print("Usage: python benchmarks/conformance.py [--cases=N] [--seed=N] [--engines=a,b,...] "
+                  "[--statements=N] [--depth=N] [--foreign=RATE] [--faults=RATE] [--reproducers=<dir>] [--no-shrink]")
+            sys.exit(1)
+    unknown = [engine for engine in engines if engine not in RUNNERS or engine == 'reference']
+    if unknown:
+        print(f'Unknown engines: {", ".join(unknown)}; available: {", ".join(ENGINES)}')
+        sys.exit(1)
+    if np is None and 'batch' in engines:
+        engines = tuple(engine for engine in engines if engine != 'batch')
+
+    seconds, executed, failures, expected = run_harness(cases, seed, engines, statements, depth, foreign_rate,
+                                                        reproducers, shrinking, fault_rate)
+    report(seconds, executed, failures, cases, expected)
+    if any(failures.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
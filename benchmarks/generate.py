@@ -0,0 +1,127 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frontend import Formatter, Number, Variable, UnaryOp, BinaryOp, Assign, Output, PRECEDENCE
+
+SYNONYMS = {
+    'add': 'sum',
+    'mult': 'prod',
+    'sub': 'minus',
+    'div': '/',
+    'rem': '%',
+    'xor': '><',
+    'input': 'in',
+    'output': 'print',
+    '=': '->',
+}
+
+VARIANTS = {
+    'op()': ('left', 'op()', 'op()', False),
+    '()op': ('left', '()op', '()op', False),
+    '(op)': ('left', 'op()', '(op)', False),
+    '(op)+()op': ('left', '()op', '(op)', False),
+    'right=,op()': ('right', 'op()', 'op()', False),
+    'right=,()op': ('right', '()op', '()op', False),
+    'op()+synonyms': ('left', 'op()', 'op()', True),
+    '()op+synonyms': ('left', '()op', '()op', True),
+    '(op)+synonyms': ('left', '()op', '(op)', True),
+    'right=,(op)+synonyms': ('right', 'op()', '(op)', True),
+}
+
+OPERATORS = sorted(PRECEDENCE)
+
+
+def settings_text(variant):
+    placement, unary, binary, synonyms = VARIANTS[variant]
+    lines = [placement + '=']
+    if binary == '(op)':
+        lines.append(unary)
+        lines.append('(op)')
+    else:
+        lines.append(binary)
+    if synonyms:
+        lines.extend(f'{original} {synonym}' for original, synonym in SYNONYMS.items())
+    return '\n'.join(lines) + '\n'
+
+
+def formatter(variant, base_assign=10):
+    placement, unary, binary, synonyms = VARIANTS[variant]
+    return Formatter(placement, unary, binary, base_assign, SYNONYMS if synonyms else None)
+
+
+def random_expression(rng, depth, names, faults=0.0, unknown=()):
+    if depth == 0 or rng.random() < 0.2:
+        if faults and unknown and rng.random() < faults:
+            return Variable(rng.choice(unknown))
+        if names and rng.random() < 0.6:
+            return Variable(rng.choice(names))
+        return Number(rng.choice((rng.randrange(1, 100), rng.getrandbits(32))))
+    if rng.random() < 0.1:
+        return UnaryOp('not', random_expression(rng, depth - 1, names, faults, unknown))
+    op = rng.choice(OPERATORS)
+    left = random_expression(rng, depth - 1, names, faults, unknown)
+    right = random_expression(rng, depth - 1, names, faults, unknown)
+    if op in ('div', 'rem'):
+        if faults and rng.random() < faults:
+            return BinaryOp(op, left, Number(0) if rng.random() < 0.5 else right)
+        right = BinaryOp('or', right, Number(1))
+    return BinaryOp(op, left, right)
+
+
+def nested_comment(rng, depth):
+    if depth <= 0:
+        return ''
+    return '[' + ' c' * rng.randrange(1, 4) + nested_comment(rng, depth - 1) + ' ]'
+
+
+def generate_statements(statements=100, depth=3, variables=10, seed=0):
+    rng = random.Random(seed)
+    names = [f'v{i}' for i in range(variables)]
+    defined = []
+    result = []
+    for _ in range(statements):
+        if defined and rng.random() < 0.1:
+            result.append(Output(random_expression(rng, depth, defined), ''))
+            continue
+        target = rng.choice(names)
+        result.append(Assign(target, random_expression(rng, depth, defined)))
+        if target not in defined:
+            defined.append(target)
+    return result
+
+
+def generate_program(variant, statements=100, depth=3, variables=10, comment_depth=0, seed=0):
+    rng = random.Random(seed)
+    writer = formatter(variant)
+    lines = []
+    for statement in generate_statements(statements, depth, variables, seed):
+        text = writer.statement(statement) + ';'
+        if comment_depth and rng.random() < 0.2:
+            text = nested_comment(rng, comment_depth) + text
+        if rng.random() < 0.1:
+            text += ' # comment'
+        lines.append(text)
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python benchmarks/generate.py <directory> [statements] [depth] [variables] [comment_depth]")
+        sys.exit(1)
+    directory = sys.argv[1]
+    sizes = [int(arg) for arg in sys.argv[2:6]]
+    os.makedirs(directory, exist_ok=True)
+    for i, variant in enumerate(VARIANTS):
+        stem = os.path.join(directory, f'dialect{i}')
+        with open(stem + '.settings.txt', 'w') as file:
+            file.write(settings_text(variant))
+        with open(stem + '.program.txt', 'w') as file:
+            file.write(generate_program(variant, *sizes, seed=i))
+        print(f'{stem}: {variant}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generate import VARIANTS, settings_text, generate_program
+from interpreter import Interpreter
+from frontend import Number, Variable, UnaryOp, BinaryOp, Assign
+from codegen import compile_program
+from output import OutputSink
+from source import scan
+
+PROFILES = {
+    'small': dict(statements=200, depth=3, variables=10, comment_depth=0),
+    'wide': dict(statements=2000, depth=2, variables=200, comment_depth=0),
+    'deep': dict(statements=200, depth=7, variables=10, comment_depth=0),
+    'comments': dict(statements=500, depth=2, variables=10, comment_depth=30),
+}
+QUICK_PROFILES = ('small', 'comments')
+BASES = (2, 7, 10, 16, 36)
+NOISE_FLOOR = 0.0005
+
+
+def best_of(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def postfix(node, values, tokens):
+    kind = type(node)
+    if kind is Number:
+        tokens.append(str(node.value))
+    elif kind is Variable:
+        tokens.append(str(values[node.name]))
+    elif kind is UnaryOp:
+        return False
+    else:
+        if not postfix(node.left, values, tokens) or not postfix(node.right, values, tokens):
+            return False
+        tokens.append(node.op)
+    return True
+
+
+def split_assignment(interpreter, line):
+    line = interpreter.translate(interpreter.remove_comments(line))
+    if '=' not in line:
+        return None
+    if interpreter.result_placement == 'left':
+        return line.split('=', 1)[1].strip()
+    return line.split('=', 1)[0].strip()
+
+
+def measure_case(settings_path, program, repeat):
+    interpreter = Interpreter(settings_path, base_assign=10)
+    interpreter.output = OutputSink(io.StringIO())
+    stages = {}
+
+    stages['load_settings'] = best_of(lambda: interpreter.load_settings(settings_path), repeat)
+
+    chunks = program.split(';')
+    stages['remove_nested_comments'] = best_of(
+        lambda: [interpreter.remove_nested_comments(chunk) for chunk in chunks], repeat)
+
+    statements = interpreter.parse(program)
+    for statement in statements:
+        interpreter.run_statement(statement)
+
+    expressions = [expr for expr in (split_assignment(interpreter, chunk) for chunk in chunks) if expr]
+    stages['tokenize'] = best_of(lambda: [interpreter.tokenize(expr) for expr in expressions], repeat)
+    stages['evaluate_infix'] = best_of(lambda: [interpreter.evaluate_infix(expr) for expr in expressions], repeat)
+
+    values = {name: interpreter.variables.search(name) for name in interpreter.variables.obtain_all()}
+    postfixes = []
+    for statement in statements:
+        tokens = []
+        if type(statement) is Assign and type(statement.expr) is BinaryOp and postfix(statement.expr, values, tokens):
+            postfixes.append(tokens)
+    stages['eval_postfix'] = best_of(lambda: [interpreter.eval_postfix(tokens) for tokens in postfixes], repeat)
+
+    numbers = list(values.values())
+    stages['decimal_to_base'] = best_of(
+        lambda: [interpreter.decimal_to_base(value, base) for value in numbers for base in BASES], repeat)
+
+    stages['scan'] = best_of(lambda: scan(program), repeat)
+    stages['parse'] = best_of(lambda: interpreter.parse(program), repeat)
+    stages['evaluate'] = best_of(lambda: [interpreter.run_statement(statement) for statement in statements], repeat)
+    compiled = compile_program(statements)
+    stages['codegen_compile'] = best_of(lambda: compile_program(statements), 1)
+    stages['codegen_run'] = best_of(lambda: compiled.run(interpreter), repeat)
+    return stages
+
+
+def run_suite(profiles, repeat):
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            for variant in VARIANTS:
+                settings_path = os.path.join(directory, 'settings.txt')
+                with open(settings_path, 'w') as file:
+                    file.write(settings_text(variant))
+                for profile in profiles:
+                    program = generate_program(variant, seed=1, **PROFILES[profile])
+                    name = f'{variant}/{profile}'
+                    results[name] = measure_case(settings_path, program, repeat)
+                    print(f'{name:32} ' + ' '.join(f'{stage}={seconds * 1000:.2f}ms'
+                                                   for stage, seconds in results[name].items()))
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, stages in sorted(results.items()):
+        for stage, seconds in stages.items():
+            before = baseline.get(name, {}).get(stage)
+            if not before:
+                continue
+            ratio = seconds / before
+            marker = ''
+            if ratio > 1 + threshold and seconds - before > NOISE_FLOOR:
+                marker = '  REGRESSION'
+                regressions.append((name, stage, ratio))
+            elif ratio < 1 - threshold:
+                marker = '  faster'
+            print(f'{name:32} {stage:24} {before * 1000:10.3f}ms -> {seconds * 1000:10.3f}ms  x{ratio:.2f}{marker}')
+    return regressions
+
+
+def main():
+    argv = sys.argv
+    quick = '--quick' in argv
+    output = None
+    baseline = None
+    threshold = 0.10
+    repeat = 3
+    for arg in argv[1:]:
+        if arg.startswith('--output='):
+            output = arg.split('=', 1)[1]
+        elif arg.startswith('--compare='):
+            baseline = arg.split('=', 1)[1]
+        elif arg.startswith('--threshold='):
+            threshold = float(arg.split('=', 1)[1])
+        elif arg.startswith('--repeat='):
+            repeat = int(arg.split('=', 1)[1])
+
+    profiles = QUICK_PROFILES if quick else tuple(PROFILES)
+    results = run_suite(profiles, repeat)
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+    if output:
+        with open(output, 'w') as file:
+            json.dump(report, file, indent=2)
+    if baseline:
+        with open(baseline) as file:
+            regressions = compare(results, json.load(file)['results'], threshold)
+        if regressions:
+            print(f'{len(regressions)} regressions above {threshold:.0%}')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from interpreter import Trie
+
+
+class LegacyTrieNode:
+    def __init__(self):
+        self.children = {}
+        self.value = None
+        self.is_end_of_word = False
+
+
+class LegacyTrie:
+    def __init__(self):
+        self.root = LegacyTrieNode()
+
+    def insert(self, key, value):
+        node = self.root
+        for char in key:
+            if char not in node.children:
+                node.children[char] = LegacyTrieNode()
+            node = node.children[char]
+        node.is_end_of_word = True
+        node.value = value
+
+    def search(self, key):
+        node = self.root
+        for char in key:
+            if char not in node.children:
+                return None
+            node = node.children[char]
+        if node.is_end_of_word:
+            return node.value
+        return None
+
+    def obtain_all(self):
+        def _obtain_all(node, prefix):
+            if node == None:
+                return
+            if node.is_end_of_word:
+                results.append(prefix)
+            for char, next_node in node.children.items():
+                _obtain_all(next_node, prefix + char)
+
+        results = []
+        _obtain_all(self.root, "")
+        return results
+
+
+def generate_names(count, length, seed=0):
+    rng = random.Random(seed)
+    prefixes = [f'module{i}_' for i in range(16)]
+    names = []
+    for i in range(count):
+        tail = ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz_') for _ in range(length))
+        names.append(f'{rng.choice(prefixes)}{tail}{i}')
+    return names
+
+
+def measure(cls, names):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = cls()
+    for i, name in enumerate(names):
+        store.insert(name, i)
+    insert_time = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for name in names:
+        store.search(name)
+    search_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store.obtain_all()
+    listing_time = time.perf_counter() - start
+    return memory, insert_time, search_time, listing_time
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    length = int(sys.argv[2]) if len(sys.argv) > 2 else 24
+    names = generate_names(count, length)
+    print(f'{count} names, {length}+ characters each')
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), length * 4 + 100))
+    for label, cls in (('legacy', LegacyTrie), ('radix', Trie)):
+        memory, insert_time, search_time, listing_time = measure(cls, names)
+        print(f'{label:8} memory={memory / 2 ** 20:9.1f} MiB  insert={insert_time:7.3f}s  '
+              f'search={search_time:7.3f}s  obtain_all={listing_time:7.3f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+
+CACHE_VERSION = 1
+CACHE_DIRECTORY = '__progcache__'
+COMPILER_MODULES = ('source.py', 'lexer.py', 'dialect.py', 'frontend.py', 'evaluator.py', 'optimizer.py', 'codegen.py')
+
+_fingerprint = None
+
+
+def compiler_fingerprint():
+    global _fingerprint
+    if _fingerprint is None:
+        digest = hashlib.sha256()
+        directory = os.path.dirname(os.path.abspath(__file__))
+        for name in COMPILER_MODULES:
+            with open(os.path.join(directory, name), 'rb') as file:
+                digest.update(file.read())
+        _fingerprint = digest.hexdigest()
+    return _fingerprint
+
+
+def program_key(program, dialect, base_assign, *options):
+    digest = hashlib.sha256()
+    digest.update(repr((CACHE_VERSION, compiler_fingerprint(), sys.version_info[:2])).encode())
+    digest.update(program.encode('utf-8'))
+    digest.update(repr((dialect.key(), base_assign) + options).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ProgramCache:
+    def __init__(self, directory=CACHE_DIRECTORY):
+        self.directory = directory
+
+    def path(self, key, kind):
+        return os.path.join(self.directory, f'{key}.{kind}')
+
+    def load(self, key, kind):
+        try:
+            with open(self.path(key, kind), 'rb') as file:
+                return pickle.load(file)
+        except (OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None
+
+    def store(self, key, kind, value):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            handle, temp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        except OSError:
+            return
+        try:
+            with os.fdopen(handle, 'wb') as file:
+                pickle.dump(value, file, pickle.HIGHEST_PROTOCOL)
+            os.replace(temp, self.path(key, kind))
+        except (OSError, pickle.PicklingError, RecursionError):
+            if os.path.exists(temp):
+                os.remove(temp)
+
+    def clear(self):
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith(('.ast', '.code')):
+                os.remove(os.path.join(self.directory, name))
@@ -0,0 +1,170 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from bisect import bisect_left
+
+from dialect import Dialect
+
+MAGIC = b'LAB1CKPT'
+CHECKPOINT_VERSION = 1
+HEADER = struct.Struct('<8sHBBBxxx32sQQQQQQQ')
+BIG = -1 << 63
+BIG_ENTRY = struct.Struct('<QI')
+CHECKPOINT_FILE = 'checkpoint.ckpt'
+
+
+def program_digest(program):
+    if program is None:
+        return bytes(32)
+    return hashlib.sha256(program.encode('utf-8')).digest()
+
+
+def chunks_digest(chunks):
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk.encode('utf-8'))
+    return digest.digest()
+
+
+def align(size):
+    return (size + 7) & ~7
+
+
+def write_checkpoint(path, items, dialect, base_input, base_output, base_assign, position, program=None):
+    names = []
+    values = array('q')
+    big = []
+    for name, value in sorted((name.encode('utf-8'), value) for name, value in items):
+        if BIG < value < 1 << 63:
+            values.append(value)
+        else:
+            size = (value.bit_length() + 8) // 8
+            big.append(BIG_ENTRY.pack(len(names), size))
+            big.append(value.to_bytes(size, 'little', signed=True))
+            values.append(BIG)
+        names.append(name)
+    offsets = array('Q', [0])
+    total = 0
+    for name in names:
+        total += len(name)
+        offsets.append(total)
+
+    settings = json.dumps({
+        'commands': dialect.commands,
+        'result_placement': dialect.result_placement,
+        'unary_syntax': dialect.unary_syntax,
+        'binary_syntax': dialect.binary_syntax,
+    }, ensure_ascii=False).encode('utf-8')
+    big = b''.join(big)
+    offsets_start = align(HEADER.size + len(settings))
+    values_start = offsets_start + offsets.itemsize * len(offsets)
+    big_start = values_start + values.itemsize * len(values)
+    names_start = big_start + len(big)
+    header = HEADER.pack(MAGIC, CHECKPOINT_VERSION, base_input, base_output, base_assign,
+                         program_digest(program), position, len(names), len(settings),
+                         offsets_start, values_start, big_start, names_start)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(handle, 'wb') as file:
+            file.write(header)
+            file.write(settings)
+            file.write(bytes(offsets_start - HEADER.size - len(settings)))
+            file.write(offsets.tobytes())
+            file.write(values.tobytes())
+            file.write(big)
+            file.write(b''.join(names))
+        os.replace(temp, path)
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+
+
+class Names:
+    def __init__(self, map, start, offsets):
+        self.map = map
+        self.start = start
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        start = self.start
+        return self.map[start + self.offsets[index]:start + self.offsets[index + 1]]
+
+
+class Checkpoint:
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.map) < HEADER.size:
+            raise ValueError("Некорректный файл контрольной точки")
+        (magic, version, self.base_input, self.base_output, self.base_assign, self.digest, self.position,
+         self.count, settings_size, offsets_start, values_start, big_start,
+         names_start) = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != CHECKPOINT_VERSION:
+            raise ValueError("Некорректный файл контрольной точки")
+        view = memoryview(self.map)
+        settings = json.loads(bytes(view[HEADER.size:HEADER.size + settings_size]).decode('utf-8'))
+        self.dialect = Dialect(settings['commands'], settings['result_placement'],
+                               settings['unary_syntax'], settings['binary_syntax'])
+        self.offsets = view[offsets_start:values_start].cast('Q')
+        self.values = view[values_start:big_start].cast('q')
+        self.big_section = view[big_start:names_start]
+        self.names = Names(self.map, names_start, self.offsets)
+        self.big = None
+
+    def matches(self, program):
+        return self.digest == bytes(32) or self.digest == program_digest(program)
+
+    def matches_chunks(self, chunks):
+        return self.digest == bytes(32) or self.digest == chunks_digest(chunks)
+
+    def index(self, key):
+        name = key.encode('utf-8')
+        index = bisect_left(self.names, name)
+        if index < self.count and self.names[index] == name:
+            return index
+        return None
+
+    def name(self, index):
+        return self.names[index].decode('utf-8')
+
+    def value(self, index):
+        value = self.values[index]
+        if value != BIG:
+            return value
+        if self.big is None:
+            self.big = {}
+            section = self.big_section
+            pos = 0
+            while pos < len(section):
+                position, size = BIG_ENTRY.unpack_from(section, pos)
+                pos += BIG_ENTRY.size
+                self.big[position] = int.from_bytes(section[pos:pos + size], 'little', signed=True)
+                pos += size
+        return self.big[index]
+
+    def get(self, key):
+        index = self.index(key)
+        if index is None:
+            return None
+        return self.value(index)
+
+    def range(self, prefix=''):
+        if not prefix:
+            return 0, self.count
+        encoded = prefix.encode('utf-8')
+        return bisect_left(self.names, encoded), bisect_left(self.names, encoded + b'\xff')
+
+    def items(self, prefix=''):
+        start, end = self.range(prefix)
+        for index in range(start, end):
+            yield self.name(index), self.value(index)
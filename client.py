@@ -0,0 +1,78 @@
+import json
+import os
+import socket
+import sys
+import tempfile
+
+SOCKET_NAME = 'lab1-interpreter.sock'
+
+
+def default_socket():
+    directory = os.environ.get('XDG_RUNTIME_DIR')
+    if directory:
+        return os.path.join(directory, SOCKET_NAME)
+    return os.path.join(tempfile.gettempdir(), f'lab1-interpreter-{os.getuid()}.sock')
+
+
+DEFAULT_SOCKET = default_socket()
+
+
+def send(connection, message):
+    connection.sendall(json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n')
+
+
+def run(program, settings, socket_path=DEFAULT_SOCKET, stdout=None, **options):
+    stdout = stdout if stdout is not None else sys.stdout
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        send(connection, dict(type='run', program=program, settings=settings, **options))
+        reader = connection.makefile('r', encoding='utf-8')
+        for line in reader:
+            message = json.loads(line)
+            kind = message['type']
+            if kind == 'output':
+                stdout.write(message['text'])
+                stdout.flush()
+            elif kind == 'input':
+                send(connection, {'type': 'input', 'value': input(f'Enter value for {message["name"]}: ')})
+            elif kind == 'error':
+                return message['message']
+            elif kind == 'done':
+                return None
+    return "Соединение с сервером закрыто"
+
+
+def main():
+    argv = sys.argv
+    if len(argv) < 3:
+        print("Usage: python client.py <program_file> <settings_file> [--socket=<path>] [-O|--optimize] [--codegen] [base_input] [base_output] [base_assign]")
+        sys.exit(1)
+
+    with open(argv[1], 'r') as file:
+        program = file.read()
+    with open(argv[2], 'r') as file:
+        settings = file.read()
+    socket_path = DEFAULT_SOCKET
+    options = {}
+    for arg in argv[3:]:
+        if arg.startswith('--socket='):
+            socket_path = arg.split('=', 1)[1]
+        elif arg in ('-O', '--optimize'):
+            options['optimize'] = True
+        elif arg == '--codegen':
+            options['codegen'] = True
+        elif arg.startswith('base-assign'):
+            options['base_assign'] = int(arg.split('=')[1])
+        elif arg.startswith('base-input'):
+            options['base_input'] = int(arg.split('=')[1])
+        elif arg.startswith('base-output'):
+            options['base_output'] = int(arg.split('=')[1])
+
+    error = run(program, settings, socket_path, **options)
+    if error is not None:
+        print(error, file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+import marshal
+
+from frontend import Number, Variable, UnaryOp, Assign, Input, Output
+
+MAX_DEPTH = 40
+
+TEMPLATES = {
+    'add': '(({} + {}) & 0xFFFFFFFF)',
+    'mult': '(({} * {}) & 0xFFFFFFFF)',
+    'sub': '(({} - {}) & 0xFFFFFFFF)',
+    'div': '({} // {})',
+    'rem': '({} % {})',
+    'xor': '({} ^ {})',
+    'and': '({} & {})',
+    'or': '({} | {})',
+    'pow': '_pow({}, {}, 0x100000000)',
+    'not': '(~{} & 0xFFFFFFFF)',
+}
+
+
+class CompiledProgram:
+    def __init__(self, source, slots, code=None):
+        self.source = source
+        self.slots = slots
+        self.code = code if code is not None else compile(source, '<program>', 'exec')
+        namespace = {'_pow': pow}
+        exec(self.code, namespace)
+        self.function = namespace['program']
+
+    def __getstate__(self):
+        return self.source, self.slots, marshal.dumps(self.code)
+
+    def __setstate__(self, state):
+        source, slots, code = state
+        self.__init__(source, slots, marshal.loads(code))
+
+    def run(self, interpreter):
+        variables = interpreter.variables
+        slots = self.slots
+
+        def load(name):
+            value = variables.search(name)
+            if value is None:
+                raise ValueError("Недопустимый токен: " + name)
+            return value
+
+        def sync(values):
+            for slot, name in slots.items():
+                if slot in values:
+                    variables.insert(name, values[slot])
+
+        self.function(load, interpreter.read_input, interpreter.write_output, sync)
+
+
+class CodeGenerator:
+    def __init__(self):
+        self.slots = {}
+        self.names = {}
+        self.lines = []
+        self.loaded = set()
+        self.spilled = 0
+
+    def slot(self, name):
+        slot = self.names.get(name)
+        if slot is None:
+            slot = f'v{len(self.names)}'
+            self.names[name] = slot
+            self.slots[slot] = name
+        return slot
+
+    def load(self, name, line):
+        slot = self.slot(name)
+        if name in self.loaded or name in line:
+            return slot
+        line.add(name)
+        return f'({slot} := _load({name!r}))'
+
+    def expression(self, node, line, depth=0):
+        kind = type(node)
+        if kind is Number:
+            return repr(node.value)
+        if kind is Variable:
+            return self.load(node.name, line)
+        if depth >= MAX_DEPTH:
+            spilled = set()
+            text = self.expression(node, spilled)
+            self.loaded |= spilled
+            self.spilled += 1
+            temp = f'_e{self.spilled}'
+            self.lines.append(f'        {temp} = {text}')
+            return temp
+        if kind is UnaryOp:
+            return TEMPLATES[node.op].format(self.expression(node.operand, line, depth + 1))
+        left = self.expression(node.left, line, depth + 1)
+        position = len(self.lines)
+        spilled = self.spilled
+        right = self.expression(node.right, line, depth + 1)
+        if self.spilled != spilled and not (left.isidentifier() or left.isdigit()):
+            self.spilled += 1
+            temp = f'_e{self.spilled}'
+            self.lines.insert(position, f'        {temp} = {left}')
+            left = temp
+        return TEMPLATES[node.op].format(left, right)
+
+    def generate(self, statements):
+        self.lines = ['def program(_load, _input, _output, _sync):', '    try:']
+        self.loaded = set()
+        for statement in statements:
+            kind = type(statement)
+            if kind is Input:
+                self.lines.append(f'        {self.slot(statement.target)} = _input({statement.target!r})')
+                self.loaded.add(statement.target)
+                continue
+            line = set()
+            expr = self.expression(statement.expr, line)
+            if kind is Assign:
+                self.lines.append(f'        {self.slot(statement.target)} = {expr}')
+            elif kind is Output:
+                self.lines.append(f'        _output({statement.label!r}, {expr})')
+            else:
+                self.lines.append(f'        {expr}')
+            self.loaded |= line
+            if kind is Assign:
+                self.loaded.add(statement.target)
+        self.lines.append('        pass')
+        self.lines.append('    finally:')
+        self.lines.append('        _sync(locals())')
+        return '\n'.join(self.lines) + '\n'
+
+
+def compile_program(statements):
+    generator = CodeGenerator()
+    source = generator.generate(statements)
+    return CompiledProgram(source, generator.slots)
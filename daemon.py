@@ -0,0 +1,184 @@
+import asyncio
+import json
+import os
+import signal
+import socket
+import stat
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from client import DEFAULT_SOCKET
+from dialect import Dialect
+from interpreter import Interpreter
+from output import OutputSink
+from numerals import decode
+
+MAX_SESSIONS = 64
+MESSAGE_LIMIT = 1 << 26
+SOCKET_MODE = 0o600
+OPTIONS = ('base_input', 'base_output', 'base_assign', 'optimize', 'codegen')
+
+
+class Session:
+    def __init__(self, server, reader, writer):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.loop = asyncio.get_running_loop()
+        self.inputs = asyncio.Queue()
+        self.runs = asyncio.Queue()
+        self.interpreter = None
+        self.key = None
+
+    def send(self, message):
+        if not self.writer.is_closing():
+            self.writer.write(json.dumps(message, ensure_ascii=False).encode('utf-8') + b'\n')
+
+    def write(self, text):
+        self.loop.call_soon_threadsafe(self.send, {'type': 'output', 'text': text})
+
+    def flush(self):
+        pass
+
+    async def request_input(self, name):
+        self.send({'type': 'input', 'name': name})
+        return await self.inputs.get()
+
+    def read_input(self, name):
+        self.interpreter.output.flush()
+        value = asyncio.run_coroutine_threadsafe(self.request_input(name), self.loop).result()
+        if value is None:
+            raise ValueError("Соединение закрыто")
+        return decode(value, self.interpreter.base_input)
+
+    def interpreter_for(self, message):
+        options = {name: message[name] for name in OPTIONS if name in message}
+        options.setdefault('base_assign', 10)
+        dialect = self.server.dialect(message.get('settings', ''))
+        key = (dialect, tuple(sorted(options.items())))
+        if key != self.key:
+            interpreter = Interpreter(dialect, **options)
+            interpreter.output = OutputSink(self)
+            interpreter.read_input = self.read_input
+            self.interpreter = interpreter
+            self.key = key
+        return self.interpreter
+
+    async def execute(self, message):
+        try:
+            interpreter = self.interpreter_for(message)
+            await self.loop.run_in_executor(self.server.executor, interpreter.execute, message['program'])
+        except Exception as e:
+            self.send({'type': 'error', 'message': f'{type(e).__name__}: {e}'})
+        else:
+            self.send({'type': 'done'})
+        try:
+            await self.writer.drain()
+        except ConnectionError:
+            pass
+
+    async def run_queue(self):
+        while True:
+            message = await self.runs.get()
+            if message is None:
+                return
+            await self.execute(message)
+
+    async def serve(self):
+        runner = asyncio.create_task(self.run_queue())
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    kind = message['type']
+                except (ValueError, KeyError, TypeError):
+                    self.send({'type': 'error', 'message': "Недопустимое сообщение"})
+                    continue
+                if kind == 'input':
+                    await self.inputs.put(str(message.get('value', '')))
+                elif kind == 'run':
+                    await self.runs.put(message)
+                else:
+                    self.send({'type': 'error', 'message': "Недопустимое сообщение"})
+        except ConnectionError:
+            pass
+        finally:
+            await self.inputs.put(None)
+            await self.runs.put(None)
+            await runner
+            self.writer.close()
+
+
+class Server:
+    def __init__(self, socket_path=DEFAULT_SOCKET, max_sessions=MAX_SESSIONS):
+        self.socket_path = socket_path
+        self.executor = ThreadPoolExecutor(max_sessions)
+        self.dialects = {}
+        self.bound = False
+
+    def dialect(self, settings):
+        dialect = self.dialects.get(settings)
+        if dialect is None:
+            dialect = Dialect.parse(settings.splitlines())
+            self.dialects[settings] = dialect
+        return dialect
+
+    async def handle(self, reader, writer):
+        await Session(self, reader, writer).serve()
+
+    def in_use(self):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(self.socket_path)
+            except OSError:
+                return False
+        return True
+
+    def bind(self):
+        try:
+            if stat.S_ISSOCK(os.stat(self.socket_path).st_mode):
+                if self.in_use():
+                    raise ValueError("Демон уже запущен: " + self.socket_path)
+                os.remove(self.socket_path)
+        except FileNotFoundError:
+            pass
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            listener.bind(self.socket_path)
+            self.bound = True
+            os.chmod(self.socket_path, SOCKET_MODE)
+        except BaseException:
+            listener.close()
+            raise
+        return listener
+
+    async def serve(self):
+        server = await asyncio.start_unix_server(self.handle, sock=self.bind(), limit=MESSAGE_LIMIT)
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    socket_path = DEFAULT_SOCKET
+    max_sessions = MAX_SESSIONS
+    for arg in sys.argv[1:]:
+        if arg.startswith('--socket='):
+            socket_path = arg.split('=', 1)[1]
+        elif arg.startswith('--max-sessions='):
+            max_sessions = int(arg.split('=', 1)[1])
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    server = Server(socket_path, max_sessions)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server.bound and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+if __name__ == '__main__':
+    main()
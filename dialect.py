@@ -0,0 +1,73 @@
+import re
+
+COMMANDS = ('not', 'input', 'output', 'add', 'mult', 'sub', 'pow', 'div', 'rem', 'xor', 'and', 'or', '=')
+
+BOUNDARY = r'\s(),='
+
+
+class Dialect:
+    def __init__(self, synonyms=None, result_placement='left', unary_syntax='op()', binary_syntax='op()'):
+        self.commands = {name: name for name in COMMANDS}
+        if synonyms:
+            self.commands.update(synonyms)
+        self.result_placement = result_placement
+        self.unary_syntax = unary_syntax
+        self.binary_syntax = binary_syntax
+        self.compile()
+
+    @classmethod
+    def load(cls, settings_file):
+        with open(settings_file, 'r') as file:
+            return cls.parse(file)
+
+    @classmethod
+    def parse(cls, lines):
+        dialect = cls()
+        for line in lines:
+            line = line.strip().lower()
+            if not line or line.startswith('#'):
+                continue
+
+            if line == 'left=':
+                dialect.result_placement = 'left'
+            elif line == 'right=':
+                dialect.result_placement = 'right'
+            elif line in ['op()', '()op']:
+                dialect.binary_syntax = line
+                dialect.unary_syntax = line
+            elif line == "(op)":
+                dialect.binary_syntax = line
+            else:
+                parts = line.split()
+                if len(parts) == 2:
+                    dialect.commands[parts[0]] = parts[1]
+                elif len(parts) == 3 and parts[0] == '[':
+                    dialect.commands[parts[1]] = parts[2].rstrip(']')
+        dialect.compile()
+        return dialect
+
+    def compile(self):
+        self.originals = {}
+        for original, synonym in self.commands.items():
+            if synonym != original:
+                self.originals[synonym] = original
+        if self.originals:
+            alternatives = '|'.join(re.escape(synonym) for synonym in sorted(self.originals, key=len, reverse=True))
+            self.matcher = re.compile(f'(?<![^{BOUNDARY}])(?:{alternatives})(?![^{BOUNDARY}])')
+        else:
+            self.matcher = None
+
+    def translate(self, line):
+        if self.matcher is None:
+            return line
+        originals = self.originals
+        return self.matcher.sub(lambda match: originals[match.group()], line)
+
+    def key(self):
+        return (tuple(sorted(self.commands.items())), self.result_placement, self.unary_syntax, self.binary_syntax)
+
+    def __eq__(self, other):
+        return isinstance(other, Dialect) and self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
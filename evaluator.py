@@ -0,0 +1,42 @@
+from frontend import Number, Variable, UnaryOp, BinaryOp
+
+MASK = 0xFFFFFFFF
+MODULUS = 0x100000000
+
+BINARY_OPERATIONS = {
+    'add': lambda a, b: (a + b) & MASK,
+    'mult': lambda a, b: (a * b) & MASK,
+    'sub': lambda a, b: (a - b) & MASK,
+    'div': lambda a, b: a // b,
+    'rem': lambda a, b: a % b,
+    'xor': lambda a, b: a ^ b,
+    'and': lambda a, b: a & b,
+    'or': lambda a, b: a | b,
+    'pow': lambda a, b: pow(a, b, MODULUS),
+}
+
+UNARY_OPERATIONS = {
+    'not': lambda a: ~a & MASK,
+}
+
+
+class Evaluator:
+    def __init__(self, variables):
+        self.variables = variables
+        self.binary = BINARY_OPERATIONS
+        self.unary = UNARY_OPERATIONS
+
+    def evaluate(self, node):
+        kind = type(node)
+        if kind is Number:
+            return node.value
+        if kind is Variable:
+            value = self.variables.search(node.name)
+            if value is None:
+                raise ValueError("Недопустимый токен: " + node.name)
+            return value
+        if kind is BinaryOp:
+            return self.binary[node.op](self.evaluate(node.left), self.evaluate(node.right))
+        if kind is UnaryOp:
+            return self.unary[node.op](self.evaluate(node.operand))
+        raise ValueError("Недопустимое выражение")
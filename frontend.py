@@ -0,0 +1,402 @@
+import re
+
+from lexer import ParseError, INT, IDENT, OP, LPAREN, RPAREN, COMMA, ASSIGN
+
+PRECEDENCE = {'add': 1,
+              'sub': 1,
+              'mult': 2,
+              'div': 2,
+              'rem': 2,
+              'xor': 1,
+              'and': 1,
+              'or': 1,
+              'pow': 3}
+
+UNARY = ('not',)
+
+PLACEMENT_ERROR = "Ошибка: недопустимое расположение операндов и операций"
+HEX_LITERAL = re.compile(r'^[0-9A-Fa-f]+$')
+TEMP_PREFIX = '_t#'
+
+
+class Number:
+    def __init__(self, value):
+        self.value = value
+
+    def __reduce__(self):
+        return Number, (self.value,)
+
+
+class Variable:
+    def __init__(self, name):
+        self.name = name
+
+    def __reduce__(self):
+        return Variable, (self.name,)
+
+
+class UnaryOp:
+    memo = None
+
+    def __init__(self, op, operand):
+        self.op = op
+        self.operand = operand
+
+    def __reduce__(self):
+        return UnaryOp, (self.op, self.operand)
+
+
+class BinaryOp:
+    memo = None
+
+    def __init__(self, op, left, right):
+        self.op = op
+        self.left = left
+        self.right = right
+
+    def __reduce__(self):
+        return BinaryOp, (self.op, self.left, self.right)
+
+
+def restore_statement(cls, fields, line, breakpoint, condition=None):
+    statement = cls(*fields)
+    statement.line = line
+    statement.breakpoint = breakpoint
+    statement.condition = condition
+    return statement
+
+
+class Statement:
+    line = None
+    breakpoint = False
+    condition = None
+    fields = ()
+
+    def __reduce__(self):
+        fields = tuple(getattr(self, name) for name in self.fields)
+        return restore_statement, (type(self), fields, self.line, self.breakpoint, self.condition)
+
+
+class Assign(Statement):
+    fields = ('target', 'expr')
+
+    def __init__(self, target, expr):
+        self.target = target
+        self.expr = expr
+
+
+class Input(Statement):
+    fields = ('target',)
+
+    def __init__(self, target):
+        self.target = target
+
+
+class Output(Statement):
+    fields = ('expr', 'label')
+
+    def __init__(self, expr, label):
+        self.expr = expr
+        self.label = label
+
+
+class ExprStatement(Statement):
+    fields = ('expr',)
+
+    def __init__(self, expr):
+        self.expr = expr
+
+
+class Parser:
+    def __init__(self, lexer, result_placement='left', unary_syntax='op()', binary_syntax='op()'):
+        self.lexer = lexer
+        self.result_placement = result_placement
+        self.unary_syntax = unary_syntax
+        self.binary_syntax = binary_syntax
+        self.text = ''
+        self.tokens = []
+        self.pos = 0
+
+    def parse_statement(self, text, line=1, column=1):
+        self.text = text = self.lexer.prepare(text)
+        tokens = self.lexer.tokenize(text, line, column)
+        if not tokens:
+            return None
+        try:
+            statement = self.statement(tokens)
+        except ParseError as error:
+            if error.line is None:
+                error.line = line
+            raise
+        statement.line = tokens[0].line
+        return statement
+
+    def parse_expression(self, text, line=1, column=1):
+        statement = self.parse_statement(text, line, column)
+        if type(statement) is not ExprStatement:
+            raise ParseError("Недопустимое выражение", line, column)
+        return statement.expr
+
+    def error(self, message, token=None):
+        if token is None:
+            if self.pos < len(self.tokens):
+                token = self.tokens[self.pos]
+            elif self.tokens:
+                token = self.tokens[-1]
+        if token is None:
+            return ParseError(message)
+        return ParseError(message, token.line, token.column)
+
+    def statement(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+        for i, token in enumerate(tokens):
+            if token.kind is ASSIGN:
+                if self.result_placement == 'left':
+                    target, expr = tokens[:i], tokens[i + 1:]
+                else:
+                    expr, target = tokens[:i], tokens[i + 1:]
+                name = self.target(target, token)
+                if self.is_input(expr):
+                    return Input(name)
+                if len(expr) == 1 and expr[0].kind is IDENT and HEX_LITERAL.match(expr[0].text):
+                    value = self.lexer.parse_int(expr[0].text)
+                    if value is None:
+                        raise self.error("Недопустимый токен: " + expr[0].text, expr[0])
+                    return Assign(name, Number(value))
+                return Assign(name, self.expression_of(expr))
+
+        if tokens[0].value == 'output' or tokens[-1].value == 'output':
+            return self.output(tokens)
+        return ExprStatement(self.expression_of(tokens))
+
+    def target(self, tokens, assign):
+        if len(tokens) != 1:
+            raise self.error("Недопустимое выражение", tokens[1] if tokens else assign)
+        if tokens[0].kind is not IDENT:
+            raise self.error("Недопустимое имя переменной: " + tokens[0].text, tokens[0])
+        return tokens[0].value
+
+    def is_input(self, tokens):
+        kinds = [(token.kind, token.value) for token in tokens]
+        if kinds == [(OP, 'input'), (LPAREN, '('), (RPAREN, ')')]:
+            return True
+        if kinds == [(LPAREN, '('), (RPAREN, ')'), (OP, 'input')]:
+            if self.unary_syntax != '()op':
+                raise self.error(PLACEMENT_ERROR, tokens[2])
+            return True
+        return False
+
+    def output(self, tokens):
+        if tokens[0].value == 'output':
+            if self.unary_syntax != 'op()':
+                raise self.error(PLACEMENT_ERROR, tokens[0])
+            if len(tokens) < 4 or tokens[1].kind is not LPAREN or tokens[-1].kind is not RPAREN:
+                raise self.error("Недопустимое выражение", tokens[0])
+            inner = tokens[2:-1]
+            label = self.text[inner[0].start:tokens[-1].start].strip()
+        else:
+            if self.unary_syntax != '()op':
+                raise self.error(PLACEMENT_ERROR, tokens[-1])
+            if len(tokens) < 4 or tokens[0].kind is not LPAREN or tokens[-2].kind is not RPAREN:
+                raise self.error("Недопустимое выражение", tokens[-1])
+            inner = tokens[1:-2]
+            label = self.text[inner[0].start:tokens[-2].start].strip()
+        return Output(self.expression_of(inner), self.lexer.label(label))
+
+    def expression_of(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+        if not tokens:
+            raise self.error("Недопустимое выражение")
+        node = self.expression(1)
+        if self.pos != len(tokens):
+            raise self.error("Недопустимое выражение")
+        return node
+
+    def peek(self):
+        if self.pos < len(self.tokens):
+            return self.tokens[self.pos]
+        return None
+
+    def advance(self):
+        token = self.peek()
+        if token is None:
+            raise self.error("Недопустимое выражение")
+        self.pos += 1
+        return token
+
+    def expect(self, kind):
+        token = self.advance()
+        if token.kind is not kind:
+            raise self.error("Недопустимое выражение", token)
+
+    def expression(self, min_precedence):
+        left = self.operand()
+        while True:
+            token = self.peek()
+            if token is None or token.kind is not OP or token.value not in PRECEDENCE:
+                return left
+            if self.binary_syntax != '(op)':
+                raise self.error(PLACEMENT_ERROR, token)
+            precedence = PRECEDENCE[token.value]
+            if precedence < min_precedence:
+                return left
+            self.pos += 1
+            right = self.expression(precedence + 1)
+            left = BinaryOp(token.value, left, right)
+
+    def arguments(self):
+        args = [self.expression(1)]
+        while self.peek() is not None and self.peek().kind is COMMA:
+            self.pos += 1
+            args.append(self.expression(1))
+        self.expect(RPAREN)
+        return args
+
+    def operand(self):
+        token = self.advance()
+        kind = token.kind
+        if kind is INT:
+            return Number(token.value)
+        if kind is IDENT:
+            return Variable(token.value)
+
+        if kind is LPAREN:
+            args = self.arguments()
+            follow = self.peek()
+            op = follow.value if follow is not None and follow.kind is OP else None
+            if op in UNARY and len(args) == 1:
+                if self.unary_syntax != '()op':
+                    raise self.error(PLACEMENT_ERROR, follow)
+                self.pos += 1
+                return UnaryOp(op, args[0])
+            if op in PRECEDENCE and len(args) == 2:
+                if self.binary_syntax != '()op':
+                    raise self.error(PLACEMENT_ERROR, follow)
+                self.pos += 1
+                return BinaryOp(op, args[0], args[1])
+            if len(args) == 1:
+                return args[0]
+            raise self.error("Недопустимое выражение", token)
+
+        if kind is OP and (token.value in UNARY or token.value in PRECEDENCE):
+            op = token.value
+            syntax = self.unary_syntax if op in UNARY else self.binary_syntax
+            follow = self.peek()
+            if syntax != 'op()' and (follow is None or follow.start != token.start + len(token.text)):
+                raise self.error(PLACEMENT_ERROR, token)
+            self.expect(LPAREN)
+            args = self.arguments()
+            if op in UNARY and len(args) == 1:
+                return UnaryOp(op, args[0])
+            if op in PRECEDENCE and len(args) == 2:
+                return BinaryOp(op, args[0], args[1])
+            raise self.error("Недопустимое выражение", token)
+
+        raise self.error("Недопустимый токен: " + token.text, token)
+
+
+DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def format_number(value, base=10):
+    if value == 0:
+        return '0'
+    digits = []
+    while value:
+        value, remainder = divmod(value, base)
+        digits.append(DIGITS[remainder])
+    text = ''.join(reversed(digits))
+    if not text[0].isdigit():
+        text = '0' + text
+    return text
+
+
+class Formatter:
+    def __init__(self, result_placement='left', unary_syntax='op()', binary_syntax='op()', base_assign=10, names=None):
+        self.result_placement = result_placement
+        self.unary_syntax = unary_syntax
+        self.binary_syntax = binary_syntax
+        self.base_assign = base_assign
+        self.names = names or {}
+        self.renamed = {}
+
+    def name(self, command):
+        return self.names.get(command, command)
+
+    def expression(self, node, parent=0, right=False):
+        kind = type(node)
+        if kind is Number:
+            return format_number(node.value, self.base_assign)
+        if kind is Variable:
+            return self.renamed.get(node.name, node.name)
+        if kind is UnaryOp:
+            operand = self.expression(node.operand)
+            if self.unary_syntax == '()op':
+                return f'({operand}){self.name(node.op)}'
+            return f'{self.name(node.op)}({operand})'
+        left = self.expression(node.left, PRECEDENCE[node.op])
+        right_text = self.expression(node.right, PRECEDENCE[node.op], True)
+        op = self.name(node.op)
+        if self.binary_syntax == '()op':
+            return f'({left}, {right_text}){op}'
+        if self.binary_syntax == 'op()':
+            return f'{op}({left}, {right_text})'
+        text = f'{left} {op} {right_text}'
+        precedence = PRECEDENCE[node.op]
+        if precedence < parent or (right and precedence == parent):
+            return f'({text})'
+        return text
+
+    def statement(self, statement):
+        kind = type(statement)
+        if kind is Output:
+            expr = statement.label or self.expression(statement.expr)
+            if self.unary_syntax == '()op':
+                return f'({expr}){self.name("output")}'
+            return f'{self.name("output")}({expr})'
+        if kind is ExprStatement:
+            return self.expression(statement.expr)
+        if kind is Input:
+            expr = '()' + self.name('input') if self.unary_syntax == '()op' else self.name('input') + '()'
+        else:
+            expr = self.expression(statement.expr)
+        target = self.renamed.get(statement.target, statement.target)
+        if self.result_placement == 'right':
+            return f'{expr} {self.name("=")} {target}'
+        return f'{target} {self.name("=")} {expr}'
+
+    def rename_temporaries(self, statements):
+        names = set()
+        temporaries = []
+        for statement in statements:
+            kind = type(statement)
+            if kind in (Assign, Input):
+                if statement.target.startswith(TEMP_PREFIX) and statement.target not in names:
+                    temporaries.append(statement.target)
+                names.add(statement.target)
+            nodes = [] if kind is Input else [statement.expr]
+            while nodes:
+                node = nodes.pop()
+                kind = type(node)
+                if kind is Variable:
+                    names.add(node.name)
+                elif kind is BinaryOp:
+                    nodes.append(node.left)
+                    nodes.append(node.right)
+                elif kind is UnaryOp:
+                    nodes.append(node.operand)
+        self.renamed = {}
+        counter = 0
+        for temporary in temporaries:
+            while True:
+                counter += 1
+                name = '_t' + str(counter)
+                if name not in names:
+                    break
+            self.renamed[temporary] = name
+
+    def program(self, statements):
+        self.rename_temporaries(statements)
+        return ''.join(self.statement(statement) + ';\n' for statement in statements)
@@ -0,0 +1,118 @@
+import difflib
+import hashlib
+import os
+import pickle
+import tempfile
+
+from frontend import Assign, Input, Output
+from optimizer import reads
+
+STATE_VERSION = 2
+STATE_SUFFIX = '.state'
+
+
+def state_path(program_file):
+    return program_file + STATE_SUFFIX
+
+
+def match_records(old_keys, new_keys):
+    head = 0
+    limit = min(len(old_keys), len(new_keys))
+    while head < limit and old_keys[head] == new_keys[head]:
+        head += 1
+    tail = 0
+    while tail < limit - head and old_keys[-1 - tail] == new_keys[-1 - tail]:
+        tail += 1
+    matches = {index: index for index in range(head)}
+    for offset in range(1, tail + 1):
+        matches[len(new_keys) - offset] = len(old_keys) - offset
+    matcher = difflib.SequenceMatcher(None, old_keys[head:len(old_keys) - tail],
+                                      new_keys[head:len(new_keys) - tail], autojunk=False)
+    for old, new, size in matcher.get_matching_blocks():
+        for k in range(size):
+            matches[head + new + k] = head + old + k
+    return matches
+
+
+class IncrementalRunner:
+    def __init__(self, interpreter, path):
+        self.interpreter = interpreter
+        self.path = path
+        self.records = self.load()
+        self.reused = 0
+        self.computed = 0
+
+    def load(self):
+        try:
+            with open(self.path, 'rb') as file:
+                version, records = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError, AttributeError):
+            return []
+        return records if version == STATE_VERSION else []
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            handle, temp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        except OSError:
+            return
+        try:
+            with os.fdopen(handle, 'wb') as file:
+                pickle.dump((STATE_VERSION, self.records), file, pickle.HIGHEST_PROTOCOL)
+            os.replace(temp, self.path)
+        except OSError:
+            if os.path.exists(temp):
+                os.remove(temp)
+
+    def key(self, statement):
+        fields = tuple(getattr(statement, name) for name in statement.fields)
+        return hashlib.blake2b(pickle.dumps((type(statement).__name__, fields), pickle.HIGHEST_PROTOCOL),
+                               digest_size=16).digest()
+
+    def apply(self, statement, value):
+        kind = type(statement)
+        if kind is Assign or kind is Input:
+            self.interpreter.variables.insert(statement.target, value)
+        elif kind is Output:
+            self.interpreter.write_output(statement.label, value)
+
+    def run(self, program, start=0):
+        interpreter = self.interpreter
+        interpreter.program = program
+        variables = interpreter.variables
+        statements = interpreter.compile(program)
+        keys = [self.key(statement) for statement in statements]
+        old = self.records
+        matches = match_records([record[0] for record in old], keys)
+        records = []
+        try:
+            for index, statement in enumerate(statements):
+                interpreter.position = index
+                match = matches.get(index)
+                if index < start:
+                    if match is not None:
+                        records.append(old[match])
+                    continue
+                if interpreter.debug and statement.breakpoint and interpreter.should_break(statement):
+                    interpreter.debug_prompt()
+                if match is not None:
+                    record = old[match]
+                    if all(variables.search(name) == value for name, value in record[1]):
+                        self.apply(statement, record[2])
+                        records.append(record)
+                        self.reused += 1
+                        continue
+                if type(statement) is Input:
+                    snapshot = ()
+                else:
+                    snapshot = tuple((name, variables.search(name)) for name in sorted(reads(statement.expr, set())))
+                value = interpreter.run_statement(statement)
+                records.append((keys[index], snapshot, value))
+                self.computed += 1
+            interpreter.position = len(statements)
+        finally:
+            self.records = records
+            self.save()
+            if interpreter.optimize and not interpreter.debug:
+                interpreter.release_temporaries()
+            interpreter.output.flush()
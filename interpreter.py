@@ -1,87 +1,259 @@
+import os
 import sys
 import re
 import json
+import heapq
+import itertools
+
+from dialect import Dialect
+from lexer import Lexer
+from frontend import Parser, Formatter, Assign, Input, Output
+from evaluator import Evaluator
+from optimizer import optimize, TEMP_PREFIX
+from codegen import compile_program
+from output import OutputSink, to_base
+from cache import ProgramCache, CACHE_DIRECTORY, program_key
+from vectorized import BatchEvaluator, read_columns, write_csv, write_outputs
+from source import scan, strip_nested_comments, read_chunks, read_mmap_chunks, read_statements
+from profiler import Profiler
+from incremental import IncrementalRunner, state_path
+from checkpoint import Checkpoint, write_checkpoint, CHECKPOINT_FILE
+from memo import MemoEvaluator, MEMO_SIZE
+from recorder import Recorder, trace_path
+from numerals import decode, decode_roman, decode_zeckendorf, fibonacci, read_values, FORMATS
 
 class TrieNode:
-    def __init__(self):
-        self.children = {}
-        self.value = None
-        self.is_end_of_word = False
+    __slots__ = ('label', 'children', 'value', 'is_end_of_word')
+
+    def __init__(self, label='', value=None, is_end_of_word=False):
+        self.label = label
+        self.children = None
+        self.value = value
+        self.is_end_of_word = is_end_of_word
 
 class Trie:
     def __init__(self):
         self.root = TrieNode()
+        self.size = 0
+        self.watches = {}
+        self.hooks = []
+
+    def __len__(self):
+        return self.size
 
     def insert(self, key, value):
         node = self.root
-        for char in key:
-            if char not in node.children:
-                node.children[char] = TrieNode()
-            node = node.children[char]
-        node.is_end_of_word = True
+        i = 0
+        length = len(key)
+        while i < length:
+            children = node.children
+            if children is None:
+                children = node.children = {}
+            child = children.get(key[i])
+            if child is None:
+                children[key[i]] = TrieNode(key[i:], value, True)
+                self.size += 1
+                return
+            label = child.label
+            if key.startswith(label, i):
+                node = child
+                i += len(label)
+                continue
+            common = 1
+            while i + common < length and label[common] == key[i + common]:
+                common += 1
+            middle = TrieNode(label[:common])
+            child.label = label[common:]
+            middle.children = {child.label[0]: child}
+            children[key[i]] = middle
+            node = middle
+            i += common
+        if not node.is_end_of_word:
+            node.is_end_of_word = True
+            self.size += 1
         node.value = value
 
     def search(self, key):
         node = self.root
-        for char in key:
-            if char not in node.children:
+        i = 0
+        length = len(key)
+        while i < length:
+            children = node.children
+            if children is None:
+                return None
+            node = children.get(key[i])
+            if node is None or not key.startswith(node.label, i):
                 return None
-            node = node.children[char]
+            i += len(node.label)
         if node.is_end_of_word:
             return node.value
         return None
-    
+
     def delete(self, key):
-        def _delete(node, key, depth):
-            if node is None:
-                return None
+        path = []
+        node = self.root
+        i = 0
+        while i < len(key):
+            if node.children is None:
+                return
+            child = node.children.get(key[i])
+            if child is None or not key.startswith(child.label, i):
+                return
+            path.append(node)
+            node = child
+            i += len(child.label)
+        if not node.is_end_of_word:
+            return
+        node.is_end_of_word = False
+        node.value = None
+        self.size -= 1
+        if not path:
+            return
+        parent = path[-1]
+        if not node.children:
+            del parent.children[node.label[0]]
+            if not parent.children:
+                parent.children = None
+            node = parent
+            if len(path) < 2:
+                return
+            parent = path[-2]
+        if node.is_end_of_word or node.children is None or len(node.children) != 1:
+            return
+        child, = node.children.values()
+        child.label = node.label + child.label
+        parent.children[child.label[0]] = child
 
-            if depth == len(key):
-                if node.is_end_of_word:
-                    node.is_end_of_word = False
-                if not node.children:
-                    return None
-                return node
+    def locate(self, prefix):
+        node = self.root
+        i = 0
+        while i < len(prefix):
+            if node.children is None:
+                return None, None
+            child = node.children.get(prefix[i])
+            if child is None:
+                return None, None
+            label = child.label
+            if prefix.startswith(label, i):
+                i += len(label)
+            elif label.startswith(prefix[i:]):
+                return child, prefix[:i] + label
+            else:
+                return None, None
+            node = child
+        return node, prefix
 
-            char = key[depth]
-            node.children[char] = _delete(node.children[char], key, depth + 1)
+    def items(self, prefix='', ordered=False):
+        node, path = self.locate(prefix)
+        if node is None:
+            return
+        stack = [(node, path)]
+        while stack:
+            node, path = stack.pop()
+            if node.is_end_of_word:
+                yield path, node.value
+            children = node.children
+            if children:
+                if ordered:
+                    children = sorted(children.items(), reverse=True)
+                    stack.extend((child, path + child.label) for _, child in children)
+                else:
+                    stack.extend((child, path + child.label) for child in reversed(children.values()))
 
-            if not node.children and not node.is_end_of_word:
-                return None
-            return node
+    def keys(self, prefix='', ordered=False):
+        for key, _ in self.items(prefix, ordered):
+            yield key
 
-        _delete(self.root, key, 0)
+    def sorted_keys(self, prefix=''):
+        return self.keys(prefix, True)
 
     def obtain_all(self):
-        def _obtain_all(node, prefix):
-            if node== None:
-                return
-            if node.is_end_of_word:
-                results.append(prefix)
-            for char, next_node in node.children.items():
-                _obtain_all(next_node, prefix + char)
+        return list(self.keys())
+
+    def watch(self, key, callback):
+        self.watches[key] = callback
+        self.insert = self.watched_insert
+        self.delete = self.watched_delete
+
+    def unwatch(self, key):
+        self.watches.pop(key, None)
+        self.unhook()
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+        self.insert = self.watched_insert
+        self.delete = self.watched_delete
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+        self.unhook()
+
+    def unhook(self):
+        if not self.watches and not self.hooks and 'insert' in self.__dict__:
+            del self.insert
+            del self.delete
+
+    def watched_insert(self, key, value):
+        for hook in self.hooks:
+            hook(key, value)
+        callback = self.watches.get(key)
+        if callback is None:
+            type(self).insert(self, key, value)
+            return
+        old = self.search(key)
+        type(self).insert(self, key, value)
+        if old != value:
+            callback(key, old, value)
+
+    def watched_delete(self, key):
+        for hook in self.hooks:
+            hook(key, None)
+        callback = self.watches.get(key)
+        if callback is None:
+            type(self).delete(self, key)
+            return
+        old = self.search(key)
+        type(self).delete(self, key)
+        if old is not None:
+            callback(key, old, None)
 
-        results = []
-        _obtain_all(self.root, "")
-        return results
+class CheckpointVariables(Trie):
+    def __init__(self, checkpoint):
+        super().__init__()
+        self.checkpoint = checkpoint
+        self.deleted = set()
+
+    def __len__(self):
+        return sum(1 for _ in self.keys())
+
+    def insert(self, key, value):
+        Trie.insert(self, key, value)
+        self.deleted.discard(key)
+
+    def search(self, key):
+        value = Trie.search(self, key)
+        if value is None and key not in self.deleted:
+            value = self.checkpoint.get(key)
+            if value is not None:
+                Trie.insert(self, key, value)
+        return value
+
+    def delete(self, key):
+        Trie.delete(self, key)
+        if self.checkpoint.index(key) is not None:
+            self.deleted.add(key)
+
+    def items(self, prefix='', ordered=False):
+        stored = ((name, value) for name, value in self.checkpoint.items(prefix)
+                  if name not in self.deleted and Trie.search(self, name) is None)
+        if ordered:
+            return heapq.merge(Trie.items(self, prefix, True), stored)
+        return itertools.chain(Trie.items(self, prefix), stored)
 
 class Interpreter:
-    def __init__(self, settings_file, base_input=10, base_output=10, base_assign=16, debug=False):
-        self.commands = {
-            'not': 'not',
-            'input': 'input',
-            'output': 'output',
-            'add': 'add',
-            'mult': 'mult',
-            'sub': 'sub',
-            'pow': 'pow',
-            'div': 'div',
-            'rem': 'rem',
-            'xor': 'xor',
-            'and': 'and',
-            'or': 'or',
-            '=': '='
-        }
+    def __init__(self, settings_file, base_input=10, base_output=10, base_assign=16, debug=False, optimize=False, codegen=False, cache=None):
+        self.dialect = Dialect()
+        self.commands = self.dialect.commands
         self.variables = Trie()
         self.base_input = base_input
         self.base_output = base_output
@@ -90,55 +262,236 @@ class Interpreter:
         self.unary_syntax = 'op()'
         self.binary_syntax = 'op()'
         self.debug = debug
-        self.load_settings(settings_file)
-        self.settings_file = settings_file
-        self.save_last_settings()
-        
-        self.oper = []
-        for original, _ in self.commands.items():
-            self.oper.append(original)
-        
+        self.optimize = optimize
+        self.codegen = codegen
+        self.cache = cache
+        self.output = OutputSink()
+        self.live_out = None
+        self.inputs = None
+        self.prompting = False
+        self.program = None
+        self.position = 0
+        self.recorder = None
+        if isinstance(settings_file, Dialect):
+            self.use_dialect(settings_file)
+            self.settings_file = None
+        else:
+            self.load_settings(settings_file)
+            self.settings_file = settings_file
+            self.save_last_settings()
+        self.evaluator = Evaluator(self.variables)
 
     def save_last_settings(self):
         with open('last_settings.json', 'w') as f:
             json.dump({'settings_file': self.settings_file}, f)
 
     def load_settings(self, settings_file):
-        with open(settings_file, 'r') as file:
-            for line in file:
-                line = line.strip().lower()
-                if not line or line.startswith('#'):
+        self.use_dialect(Dialect.load(settings_file))
+
+    def use_dialect(self, dialect):
+        self.dialect = dialect
+        self.commands = self.dialect.commands
+        self.result_placement = self.dialect.result_placement
+        self.unary_syntax = self.dialect.unary_syntax
+        self.binary_syntax = self.dialect.binary_syntax
+        self.oper = list(self.commands)
+        self.lexer = Lexer(self.commands, self.base_assign, self.dialect)
+        self.parser = Parser(self.lexer, self.result_placement, self.unary_syntax, self.binary_syntax)
+
+    def execute(self, program, start=0):
+        self.program = program
+        try:
+            recorder = self.recorder
+            if self.codegen and not self.debug and not start and recorder is None:
+                self.compile_python(program).run(self)
+                return
+            statements = self.compile(program)
+            stops = {index for index, statement in enumerate(statements) if statement.breakpoint} if self.debug else ()
+            if self.codegen and not start and not stops and not self.variables.watches and recorder is None:
+                self.compile_python(program, statements).run(self)
+                return
+            run_statement = self.run_statement
+            if not stops and not self.variables.watches:
+                if recorder is not None:
+                    recorder.run(statements, start)
+                    return
+                for statement in itertools.islice(statements, start, None):
+                    run_statement(statement)
+                return
+            if recorder is not None:
+                self.variables.add_hook(recorder.changed)
+            try:
+                for index in range(start, len(statements)):
+                    statement = statements[index]
+                    self.position = index
+                    if index in stops and self.should_break(statement):
+                        self.debug_prompt()
+                    run_statement(statement)
+                self.position = len(statements)
+            finally:
+                if recorder is not None:
+                    self.variables.remove_hook(recorder.changed)
+        finally:
+            if self.optimize and not self.debug:
+                self.release_temporaries()
+            self.output.flush()
+
+    def release_temporaries(self):
+        for name in list(self.variables.keys(TEMP_PREFIX)):
+            if self.recorder is not None:
+                self.recorder.changed(name, None)
+            self.variables.delete(name)
+
+    def parse(self, program):
+        lines, breakpoints = scan(program)
+        statements = []
+        for index, (line, start, column) in enumerate(lines):
+            statement = self.parse_line(line, start, breakpoints.get(index, False), column)
+            if statement is not None:
+                statements.append(statement)
+        return statements
+
+    def cache_key(self, program):
+        optimized = self.optimize and not self.debug
+        defined = tuple(self.variables.sorted_keys()) if optimized else ()
+        live_out = tuple(sorted(self.live_out)) if optimized and self.live_out is not None else None
+        return program_key(program, self.dialect, self.base_assign, self.debug, optimized, defined, live_out)
+
+    def compile(self, program):
+        key = None
+        if self.cache is not None:
+            key = self.cache_key(program)
+            statements = self.cache.load(key, 'ast')
+            if statements is not None:
+                return statements
+        statements = self.parse(program)
+        if self.optimize and not self.debug:
+            statements = optimize(statements, self.variables.obtain_all(), self.live_out)
+        if key is not None:
+            self.cache.store(key, 'ast', statements)
+        return statements
+
+    def compile_python(self, program, statements=None):
+        key = None
+        if self.cache is not None:
+            key = self.cache_key(program)
+            compiled = self.cache.load(key, 'code')
+            if compiled is not None:
+                return compiled
+        if statements is None:
+            statements = self.compile(program)
+        compiled = compile_program(statements)
+        if key is not None:
+            self.cache.store(key, 'code', compiled)
+        return compiled
+
+    def formatter(self):
+        return Formatter(self.result_placement, self.unary_syntax, self.binary_syntax, self.base_assign)
+
+    def dump(self, statements):
+        return self.formatter().program(statements)
+
+    def parse_line(self, line, start=1, breakpoint=False, column=1):
+        statement = self.parser.parse_statement(line, start, column)
+        if statement is not None and breakpoint:
+            statement.breakpoint = True
+            if breakpoint is not True and self.debug:
+                condition, line, column = breakpoint
+                statement.condition = self.parser.parse_expression(condition, line, column)
+        return statement
+
+    def should_break(self, statement):
+        if statement.condition is None:
+            return True
+        try:
+            return self.evaluator.evaluate(statement.condition) != 0
+        except (ValueError, ArithmeticError):
+            return False
+
+    def save_checkpoint(self, path):
+        write_checkpoint(path, self.variables.items(), self.dialect, self.base_input, self.base_output,
+                         self.base_assign, self.position, self.program)
+
+    def restore(self, checkpoint):
+        self.base_input = checkpoint.base_input
+        self.base_output = checkpoint.base_output
+        self.base_assign = checkpoint.base_assign
+        self.use_dialect(checkpoint.dialect)
+        self.variables = CheckpointVariables(checkpoint)
+        self.evaluator.variables = self.variables
+        self.position = checkpoint.position
+
+    def use_memo(self, size=MEMO_SIZE):
+        self.evaluator = MemoEvaluator(self.variables, size)
+        return self.evaluator
+
+    def use_recorder(self, path):
+        self.recorder = Recorder(path).attach(self)
+        return self.recorder
+
+    def watch(self, name):
+        self.variables.watch(name, self.on_change)
+
+    def unwatch(self, name):
+        self.variables.unwatch(name)
+
+    def on_change(self, name, old, new):
+        self.output.flush()
+        print(f'Переменная "{name}" изменена: {old} -> {new}')
+        if not self.prompting:
+            position = self.position
+            self.position = position + 1
+            try:
+                self.debug_prompt()
+            finally:
+                self.position = position
+
+    def execute_stream(self, statements, start=0):
+        recorder = self.recorder
+        if recorder is not None:
+            self.variables.add_hook(recorder.changed)
+        self.position = 0
+        try:
+            for line, line_start, column, breakpoint in statements:
+                statement = self.parse_line(line, line_start, breakpoint, column)
+                if statement is None:
                     continue
-                
-                if line == 'left=':
-                    self.result_placement = 'left'
-                elif line == 'right=':
-                    self.result_placement = 'right'
-                elif line in ['op()', '()op']:
-                    self.binary_syntax = line
-                    self.unary_syntax = line
-                elif line == "(op)":
-                    self.binary_syntax = line
-                else:
-                    parts = line.split()
-                    if len(parts) == 2:
-                        self.commands[parts[0]] = parts[1]
-                    elif len(parts) == 3 and parts[0] == '[':
-                        self.commands[parts[1]] = parts[2].rstrip(']')
-
-    def execute(self, program):
-        """  program = self.remove_comments(program) """
-        lines = program.split(';')
-        for line in lines:
-            line = line.strip()
-            line = self.remove_nested_comments(line)
-            if line:
-                if self.debug and '#BREAKPOINT' in line:
-                    self.debug_prompt()
-                    line = line.replace("#BREAKPOINT", "")
-                
-                line = self.remove_comments(line)
-                self.process_line(line)
+                if self.position >= start:
+                    if self.debug and statement.breakpoint and self.should_break(statement):
+                        self.debug_prompt()
+                    self.run_statement(statement)
+                self.position += 1
+        finally:
+            if recorder is not None:
+                self.variables.remove_hook(recorder.changed)
+            self.output.flush()
+
+    def execute_batch(self, program, columns):
+        return BatchEvaluator(columns).run(self.parse(program))
+
+    def run_statement(self, statement):
+        kind = type(statement)
+        if kind is Input:
+            value = self.read_input(statement.target)
+        else:
+            value = self.evaluator.evaluate(statement.expr)
+        if kind is Assign or kind is Input:
+            self.variables.insert(statement.target, value)
+        elif kind is Output:
+            self.write_output(statement.label, value)
+        return value
+
+    def read_input(self, name):
+        if self.inputs is not None:
+            value = next(self.inputs, None)
+            if value is None:
+                raise ValueError("Недостаточно входных данных для " + name)
+            return value
+        self.output.flush()
+        return decode(input(f'Enter value for {name}: '), self.base_input)
+
+    def write_output(self, label, value):
+        self.output.write(f'{label} = {to_base(value, self.base_output)}\n')
     
     def remove_comments(self, program):
         program = self.remove_nested_comments(program)
@@ -146,19 +499,13 @@ class Interpreter:
         return program  
 
     def remove_nested_comments(self, text):
-        pattern = r'\[([^\[\]]*?)\]'
-        while re.search(pattern, text):
-            text = re.sub(pattern, '', text)
-        return text
+        return strip_nested_comments(text)
         
+    def translate(self, line):
+        return self.dialect.translate(line)
+
     def process_line(self, line):
-        for original, synonym in self.commands.items():
-            strr1 = synonym + "("
-            strr2 =   ")" + synonym
-            strr3 = " " + synonym + " "
-            if strr1 in line or strr2 in line or strr3 in line:
-                line = line.replace(synonym, original)
-            
+        line = self.translate(line)
 
         if '=' in line:
             if self.result_placement == 'left':
@@ -168,7 +515,7 @@ class Interpreter:
             var = var.strip()
             if "input()" in line:
                 var = var.strip()
-                value = int(input(f'Enter value for {var}: '), self.base_input)
+                value = self.read_input(var)
                 self.variables.insert(var, value)
             else:
                 value = self.evaluate_expression(expr.strip())
@@ -197,8 +544,7 @@ class Interpreter:
                 raise ValueError("ошибка")
             
             value = self.evaluate_expression(var)
-            base_output_value = self.decimal_to_base(value, self.base_output)
-            print(f'{var} = {base_output_value}')
+            self.write_output(var, value)
             return value
             
         elif re.match(r'^[0-9A-Fa-f]+$', expr):
@@ -208,14 +554,7 @@ class Interpreter:
     
 
     def decimal_to_base(self, num, base):
-        if num == 0:
-            return '0'
-        digits = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
-        result = ''
-        while num:
-            num, remainder = divmod(num, base)
-            result = digits[remainder] + result
-        return result
+        return to_base(num, base)
     
     def evaluate_infix(self, expression):
         
@@ -425,38 +764,23 @@ class Interpreter:
         return 0
     
     def roman_to_int(self, s):
-        roman_numerals = {
-            'I': 1, 'V': 5, 'X': 10, 'L': 50, 'C': 100, 'D': 500, 'M': 1000
-        }
-        total = 0
-        prev_value = 0
-        for char in reversed(s):
-            value = roman_numerals[char]
-            if value < prev_value:
-                total -= value
-            else:
-                total += value
-            prev_value = value
-        return total
+        return decode_roman(s)
     
     def fib_sequence(self, max_value):
-        fibs = [1, 2]
-        while fibs[-1] + fibs[-2] <= max_value:
-            fibs.append(fibs[-1] + fibs[-2])
-        return fibs
-
-    def is_zeckendorf(self, fib_nums, fibs):
-        fib_set = set(fib_nums)
-        for i in range(1, len(fibs)):
-            if fibs[i] in fib_set and fibs[i-1] in fib_set:
-                return False
+        return [fib for fib in fibonacci(max_value) if fib <= max_value]
+
+    def is_zeckendorf(self, fib_nums, fibs=None):
+        try:
+            decode_zeckendorf(fib_nums)
+        except ValueError:
+            return False
         return True
 
     def zeckendorf_to_int(self, fib_nums):
-        return sum(fib_nums)
+        return decode_zeckendorf(fib_nums)
 
     def debug_prompt(self):
-        
+        self.output.flush()
         print("Доступные команды:")
         print("1) Вывод значения и двоичного представления переменной")
         print("2) Вывести все переменные")
@@ -465,6 +789,10 @@ class Interpreter:
         print("5) Удалить переменную")
         print("6) Продолжить выполнение кода")
         print("7) Завершить работу интерпретатора")
+        print("8) Установить точку наблюдения за переменной")
+        print("9) Снять точку наблюдения")
+        print("10) Сохранить контрольную точку")
+        self.prompting = True
         
         while True:
             command = input('DEBUG> ').strip().lower()
@@ -480,13 +808,12 @@ class Interpreter:
                     print('Переменная не объявлена')
             
             elif command == '2':
-                for var in self.variables.obtain_all():
-                    value = self.variables.search(var)
+                for var, value in self.variables.items():
                     print(f'{var} = {value}')
             
             elif command == '3':
                 var_name = input('Введите имя переменной: ').strip()
-                if var_name in self.variables.obtain_all():
+                if self.variables.search(var_name) is not None:
                     hex_value = input('Введите шестнадцатеричное значение переменной: ').strip()
                     try:
                         value = int(hex_value, 16)
@@ -499,49 +826,74 @@ class Interpreter:
             
             elif command == '4':
                 var_name = input('Введите имя новой переменной: ').strip()
-                all_var = self.variables.obtain_all()
-                while var_name in all_var:
+                while self.variables.search(var_name) is not None:
                     print('Переменная уже объявлена. Введите другое имя переменной.')
                     var_name = input('Введите имя новой переменной:  ').strip()
                     
                 value_type = input('Введите тип значения (цекендорфский(1)/римский(2)): ').strip().lower()
                 
                 if value_type == '1':
-                    fib_sequence = self.fib_sequence(10**6)
                     while True:
-                        fib_nums = list(map(int, input('Введите число в цекендорфовом представлении: ').strip().split()))
-                        if self.is_zeckendorf(fib_nums, fib_sequence):
-                            value = self.zeckendorf_to_int(fib_nums)
-                            self.variables.insert(var_name, value)
-                            print(f'Переменная {var_name} объявлена со значением {value}.')
-                            break
-                        else:
+                        try:
+                            value = decode_zeckendorf(input('Введите число в цекендорфовом представлении: '))
+                        except ValueError:
                             print('Недопустимое цекендорфово представление. Попробуйте снова.')
+                            continue
+                        self.variables.insert(var_name, value)
+                        print(f'Переменная {var_name} объявлена со значением {value}.')
+                        break
                 elif value_type == '2':
-                    roman_value = input('Введите значение римскими цифрами: ').strip().upper()
-                    value = self.roman_to_int(roman_value)
-                    self.variables.insert(var_name, value)
-                    print(f'Переменная {var_name} объявлена со значением {value}.')
+                    while True:
+                        try:
+                            value = decode_roman(input('Введите значение римскими цифрами: '))
+                        except ValueError:
+                            print('Недопустимое римское число. Попробуйте снова.')
+                            continue
+                        self.variables.insert(var_name, value)
+                        print(f'Переменная {var_name} объявлена со значением {value}.')
+                        break
                 else:
                     print('Неизвестный тип значения')
             
             elif command == '5':
                 var_name = input('Введите имя переменной: ').strip()
-                if self.variables.search(var_name):
+                if self.variables.search(var_name) is not None:
                     self.variables.delete(var_name)
                     print(f'Переменная "{var_name}" удалена')
                 else:
                     print(f'Переменная "{var_name}" не объявлена')
             
             elif command == '6':
+                self.prompting = False
                 break
             elif command == '7':
                 sys.exit(0)
 
+            elif command == '8':
+                var_name = input('Введите имя переменной: ').strip()
+                self.watch(var_name)
+                print(f'Установлена точка наблюдения за "{var_name}"')
+
+            elif command == '9':
+                var_name = input('Введите имя переменной: ').strip()
+                if var_name in self.variables.watches:
+                    self.unwatch(var_name)
+                    print(f'Точка наблюдения за "{var_name}" снята')
+                else:
+                    print(f'Точка наблюдения за "{var_name}" не установлена')
+
+            elif command == '10':
+                path = input(f'Введите имя файла ({CHECKPOINT_FILE}): ').strip() or CHECKPOINT_FILE
+                try:
+                    self.save_checkpoint(path)
+                    print(f'Контрольная точка сохранена в "{path}"')
+                except OSError as e:
+                    print(f'Не удалось сохранить контрольную точку: {e}')
+
 def main():
     argv = sys.argv
     if len(argv) < 3:
-        print("Usage: python interpreter.py <settings_file> <program_file> [--debug|-d|/debug] [base_input] [base_output] [base_assign]")
+        print("Usage: python interpreter.py <settings_file> <program_file> [--debug|-d|/debug] [--watch=<name>[,<name>...]] [--stream|--mmap] [-O|--optimize] [--dump-optimized] [--codegen] [--no-cache] [--profile[=<report.json>]] [--incremental[=<state file>]] [--resume=<checkpoint>] [--memo[=<size>]] [--trace[=<trace file>]] [--input-file=<file> [--input-format=base|roman|zeckendorf]] [--batch=<inputs.csv|.npz> [--batch-output=<file.csv|.npy>]] [base_input] [base_output] [base_assign]")
         sys.exit(1)
     
     program_file = argv[1]
@@ -569,14 +921,131 @@ def main():
         elif arg.startswith("base-output"):
             base_output = int(arg.split('=')[1])
 
-    debug = '--debug' in argv or '-d' in argv or '/debug' in argv
+    watches = []
+    for arg in argv:
+        if arg.startswith('--watch='):
+            watches.extend(name for name in arg.split('=', 1)[1].split(',') if name)
+    debug = '--debug' in argv or '-d' in argv or '/debug' in argv or bool(watches)
+    stream = '--stream' in argv or program_file == '-'
+    use_mmap = '--mmap' in argv
+    dump_optimized = '--dump-optimized' in argv
+    optimize = '-O' in argv or '--optimize' in argv or dump_optimized
+    codegen = '--codegen' in argv
+    profile = None
+    for arg in argv:
+        if arg == '--profile' or arg.startswith('--profile='):
+            profile = arg.split('=', 1)[1] if '=' in arg else ''
+    incremental = None
+    for arg in argv:
+        if arg == '--incremental' or arg.startswith('--incremental='):
+            incremental = arg.split('=', 1)[1] if '=' in arg else state_path(program_file)
+    memo = None
+    for arg in argv:
+        if arg == '--memo' or arg.startswith('--memo='):
+            memo = int(arg.split('=', 1)[1]) if '=' in arg else MEMO_SIZE
+    trace = None
+    for arg in argv:
+        if arg == '--trace' or arg.startswith('--trace='):
+            trace = arg.split('=', 1)[1] if '=' in arg else trace_path(program_file)
+    if trace is not None and incremental is not None:
+        raise ValueError("Трассировка несовместима с --incremental")
+    if profile is not None or memo is not None or trace is not None:
+        codegen = False
 
-    with open(program_file, 'r') as file:
-        program = file.read()
+    cache = None
+    if program_file != '-' and '--no-cache' not in argv:
+        cache = ProgramCache(os.path.join(os.path.dirname(os.path.abspath(program_file)), CACHE_DIRECTORY))
+
+    interpreter = Interpreter(settings_file, base_input, base_output, base_assign, debug, optimize, codegen, cache)
+    interpreter.live_out = set()
+    checkpoint = None
+    for arg in argv:
+        if arg.startswith('--resume='):
+            checkpoint = Checkpoint(arg.split('=', 1)[1])
+            interpreter.restore(checkpoint)
+            interpreter.optimize = False
+    memo_evaluator = interpreter.use_memo(memo) if memo is not None else None
+    input_format = 'base'
+    for arg in argv:
+        if arg.startswith('--input-format='):
+            input_format = arg.split('=', 1)[1]
+            if input_format not in FORMATS:
+                raise ValueError(f"Неизвестный формат значений: {input_format}")
+    for arg in argv:
+        if arg.startswith('--input-file='):
+            interpreter.inputs = iter(read_values(arg.split('=', 1)[1], input_format, interpreter.base_input))
+    for name in watches:
+        interpreter.watch(name)
+    profiler = Profiler().attach(interpreter) if profile is not None else None
+    recorder = interpreter.use_recorder(trace) if trace is not None else None
+
+    batch_input = None
+    batch_output = None
+    for arg in argv:
+        if arg.startswith('--batch='):
+            batch_input = arg.split('=', 1)[1]
+        elif arg.startswith('--batch-output='):
+            batch_output = arg.split('=', 1)[1]
+
+    try:
+        if dump_optimized:
+            with open(program_file, 'r') as file:
+                program = file.read()
+            print(interpreter.dump(interpreter.compile(program)), end='')
+        elif batch_input:
+            with open(program_file, 'r') as file:
+                program = file.read()
+            outputs = interpreter.execute_batch(program, read_columns(batch_input, base_input))
+            if batch_output:
+                write_outputs(batch_output, outputs, base_output)
+            else:
+                write_csv(sys.stdout, outputs, base_output)
+        elif use_mmap or stream:
+            start = 0
+            if checkpoint is not None:
+                if program_file == '-':
+                    raise ValueError("Контрольную точку нельзя применить к программе из стандартного ввода")
+                with open(program_file, 'r') as file:
+                    if not checkpoint.matches_chunks(read_chunks(file)):
+                        raise ValueError("Контрольная точка создана для другой программы")
+                start = checkpoint.position
+            if use_mmap:
+                interpreter.execute_stream(read_statements(read_mmap_chunks(program_file)), start)
+            elif program_file == '-':
+                interpreter.execute_stream(read_statements(read_chunks(sys.stdin)))
+            else:
+                with open(program_file, 'r') as file:
+                    interpreter.execute_stream(read_statements(read_chunks(file)), start)
+        else:
+            with open(program_file, 'r') as file:
+                program = file.read()
+            start = 0
+            if checkpoint is not None:
+                if not checkpoint.matches(program):
+                    raise ValueError("Контрольная точка создана для другой программы")
+                start = checkpoint.position
+            if incremental is not None:
+                runner = IncrementalRunner(interpreter, incremental)
+                try:
+                    runner.run(program, start)
+                finally:
+                    print(f'Повторно использовано: {runner.reused}, вычислено заново: {runner.computed}', file=sys.stderr)
+            else:
+                interpreter.execute(program, start)
+    finally:
+        if recorder is not None:
+            recorder.close()
+        if memo_evaluator is not None:
+            stats = memo_evaluator.stats()
+            print(f'Кэш выражений: попаданий {stats["hits"]}, промахов {stats["misses"]} '
+                  f'({stats["hit_rate"]:.1%}), записей {stats["entries"]}, '
+                  f'инвалидаций {stats["invalidations"]}, вытеснений {stats["evictions"]}', file=sys.stderr)
+        if profiler is not None:
+            profiler.report()
+            if profile:
+                profiler.write(profile)
 
-    interpreter = Interpreter(settings_file, base_input, base_output, base_assign, debug)
-    interpreter.execute(program)
-    
 
-main()
+if __name__ == '__main__':
+    main()
     
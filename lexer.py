@@ -0,0 +1,112 @@
+import re
+
+INT = 'int'
+IDENT = 'ident'
+OP = 'op'
+LPAREN = '('
+RPAREN = ')'
+COMMA = ','
+ASSIGN = '='
+
+PUNCTUATION = {'(': LPAREN, ')': RPAREN, ',': COMMA, '=': ASSIGN}
+
+DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+TOKEN = re.compile(r'(\n)|([^\S\n]+)|([(),=])|([^\s(),=]+)')
+SEPARATOR = re.compile(r'[\s(),=]')
+
+
+class ParseError(ValueError):
+    def __init__(self, message, line=None, column=None):
+        super().__init__(message)
+        self.message = message
+        self.line = line
+        self.column = column
+
+    def __str__(self):
+        if self.line is None:
+            return self.message
+        if self.column is None:
+            return f'Строка {self.line}: {self.message}'
+        return f'Строка {self.line}, позиция {self.column}: {self.message}'
+
+
+class Token:
+    __slots__ = ('kind', 'value', 'text', 'start', 'line', 'column')
+
+    def __init__(self, kind, value, text, start, line, column):
+        self.kind = kind
+        self.value = value
+        self.text = text
+        self.start = start
+        self.line = line
+        self.column = column
+
+    def __repr__(self):
+        return f'Token({self.kind}, {self.value!r}, {self.line}:{self.column})'
+
+
+def literal_pattern(base):
+    digits = DIGITS[:base]
+    return re.compile('[' + digits + digits.lower() + ']+')
+
+
+class Lexer:
+    def __init__(self, commands, base_assign=10, dialect=None):
+        self.operators = {name for name in commands if name != '='}
+        self.base_assign = base_assign
+        self.literal = literal_pattern(base_assign)
+        self.dialect = dialect
+        self.synonyms = dialect.originals if dialect is not None else {}
+        self.translated = any(SEPARATOR.search(synonym) for synonym in self.synonyms)
+        if self.translated:
+            self.synonyms = {}
+
+    def prepare(self, text):
+        if self.translated:
+            return self.dialect.translate(text)
+        return text
+
+    def label(self, text):
+        if self.synonyms:
+            return self.dialect.translate(text)
+        return text
+
+    def parse_int(self, text):
+        if self.literal.fullmatch(text):
+            return int(text, self.base_assign)
+        return None
+
+    def tokenize(self, text, line=1, column=1):
+        tokens = []
+        append = tokens.append
+        operators = self.operators
+        synonyms = self.synonyms
+        line_start = 1 - column
+        for match in TOKEN.finditer(text):
+            group = match.lastindex
+            if group == 1:
+                line += 1
+                line_start = match.end()
+                continue
+            if group == 2:
+                continue
+            token = match.group(group)
+            start = match.start()
+            column = start - line_start + 1
+            if group == 3:
+                append(Token(PUNCTUATION[token], token, token, start, line, column))
+                continue
+            value = synonyms.get(token, token) if synonyms else token
+            if value in operators:
+                append(Token(OP, value, token, start, line, column))
+            elif value == '=':
+                append(Token(ASSIGN, value, token, start, line, column))
+            elif '0' <= token[0] <= '9':
+                value = self.parse_int(token)
+                if value is None:
+                    raise ParseError("Недопустимый токен: " + token, line, column)
+                append(Token(INT, value, token, start, line, column))
+            else:
+                append(Token(IDENT, token, token, start, line, column))
+        return tokens
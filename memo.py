@@ -0,0 +1,123 @@
+import itertools
+from collections import OrderedDict
+
+from frontend import Number, Variable, UnaryOp, BinaryOp
+from evaluator import Evaluator
+
+MEMO_SIZE = 1 << 16
+SHAPES_PER_ENTRY = 4
+
+_shape_ids = itertools.count()
+
+
+class MemoEvaluator(Evaluator):
+    def __init__(self, variables, size=MEMO_SIZE):
+        super().__init__(variables)
+        self.size = size
+        self.cache = OrderedDict()
+        self.shapes = {}
+        self.shape_limit = max(size, 1) * SHAPES_PER_ENTRY
+        self.versions = {}
+        self.dependents = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        variables.add_hook(self.changed)
+
+    def close(self):
+        self.variables.remove_hook(self.changed)
+
+    def changed(self, name, value):
+        self.versions[name] = self.versions.get(name, 0) + 1
+        keys = self.dependents.pop(name, None)
+        if keys:
+            cache = self.cache
+            for key in keys:
+                entry = cache.pop(key, None)
+                if entry is not None:
+                    self.invalidations += 1
+                    self.forget(key, entry[1])
+
+    def forget(self, key, names):
+        dependents = self.dependents
+        for name in names:
+            keys = dependents.get(name)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del dependents[name]
+
+    def describe(self, node):
+        kind = type(node)
+        if kind is Number:
+            shape, names = ('n', node.value), ()
+        elif kind is Variable:
+            shape, names = ('v', node.name), (node.name,)
+        elif node.memo is not None:
+            return node.memo
+        elif kind is UnaryOp:
+            operand, names = self.describe(node.operand)
+            shape = (node.op, operand)
+        elif kind is BinaryOp:
+            left, left_names = self.describe(node.left)
+            right, right_names = self.describe(node.right)
+            shape = (node.op, left, right)
+            names = tuple(sorted(set(left_names + right_names)))
+        else:
+            raise ValueError("Недопустимое выражение")
+        shapes = self.shapes
+        shape_id = shapes.get(shape)
+        if shape_id is None:
+            shape_id = shapes[shape] = next(_shape_ids)
+            if len(shapes) > self.shape_limit:
+                del shapes[next(iter(shapes))]
+        if kind is UnaryOp or kind is BinaryOp:
+            node.memo = (shape_id, names)
+        return shape_id, names
+
+    def evaluate(self, node):
+        kind = type(node)
+        if kind is Number or kind is Variable:
+            return Evaluator.evaluate(self, node)
+        info = node.memo
+        if info is None:
+            info = self.describe(node)
+        shape, names = info
+        versions = self.versions
+        key = (shape, tuple([versions.get(name, 0) for name in names]))
+        cache = self.cache
+        entry = cache.get(key)
+        if entry is not None:
+            cache.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        if kind is BinaryOp:
+            value = self.binary[node.op](self.evaluate(node.left), self.evaluate(node.right))
+        else:
+            value = self.unary[node.op](self.evaluate(node.operand))
+        cache[key] = (value, names)
+        dependents = self.dependents
+        for name in names:
+            keys = dependents.get(name)
+            if keys is None:
+                dependents[name] = {key}
+            else:
+                keys.add(key)
+        if len(cache) > self.size:
+            evicted, (_, evicted_names) = cache.popitem(last=False)
+            self.forget(evicted, evicted_names)
+            self.evictions += 1
+        return value
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self.cache),
+            'invalidations': self.invalidations,
+            'evictions': self.evictions,
+        }
@@ -0,0 +1,141 @@
+import glob
+import io
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from dialect import Dialect
+from interpreter import Interpreter
+from output import OutputSink
+from numerals import read_values
+
+INPUT_SUFFIX = '.in'
+OUTPUT_SUFFIX = '.out'
+
+_dialect = None
+_options = None
+
+
+def available_cores():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def expand(patterns):
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern))
+        paths.extend(matches if matches else [pattern])
+    return paths
+
+
+def input_path(program_file, inputs_directory=None):
+    stem = os.path.splitext(os.path.basename(program_file))[0]
+    directory = inputs_directory if inputs_directory is not None else os.path.dirname(program_file)
+    path = os.path.join(directory, stem + INPUT_SUFFIX)
+    return path if os.path.exists(path) else None
+
+
+def init_worker(dialect, options):
+    global _dialect, _options
+    _dialect = dialect
+    _options = options
+
+
+def run_program(job):
+    program_file, inputs_file = job
+    captured = io.StringIO()
+    error = None
+    start = time.perf_counter()
+    try:
+        interpreter = Interpreter(_dialect, **_options)
+        interpreter.output = OutputSink(captured)
+        if inputs_file is not None:
+            interpreter.inputs = iter(read_values(inputs_file, 'base', interpreter.base_input))
+        else:
+            interpreter.inputs = iter(())
+        with open(program_file, 'r') as file:
+            program = file.read()
+        interpreter.execute(program)
+    except Exception as e:
+        error = f'{type(e).__name__}: {e}'
+    return program_file, captured.getvalue(), error, time.perf_counter() - start
+
+
+def run_batch(program_files, dialect, inputs_directory=None, workers=None, **options):
+    jobs = [(path, input_path(path, inputs_directory)) for path in program_files]
+    workers = workers or available_cores()
+    chunksize = max(1, len(jobs) // (workers * 8))
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(dialect, options)) as executor:
+        yield from executor.map(run_program, jobs, chunksize=chunksize)
+
+
+def summary(results, elapsed, slowest=5):
+    failures = [(path, error) for path, _, error, _ in results if error is not None]
+    lines = [f'Программ: {len(results)}, ошибок: {len(failures)}, '
+             f'время: {elapsed:.3f} с (сумма по программам {sum(result[3] for result in results):.3f} с)']
+    for path, error in failures:
+        lines.append(f'  {path}: {error}')
+    if results:
+        lines.append('Самые долгие:')
+        for path, _, _, seconds in sorted(results, key=lambda result: result[3], reverse=True)[:slowest]:
+            lines.append(f'  {seconds * 1000:10.3f} мс  {path}')
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    argv = sys.argv
+    if len(argv) < 3:
+        print("Usage: python multirun.py <settings_file> <program_file|glob>... [--inputs=<dir>] [--output-dir=<dir>] [--jobs=N] [-O|--optimize] [--codegen] [base_input] [base_output] [base_assign]")
+        sys.exit(1)
+
+    dialect = Dialect.load(argv[1])
+    patterns = []
+    inputs_directory = None
+    output_directory = None
+    workers = None
+    options = dict(base_input=10, base_output=10, base_assign=10)
+    for arg in argv[2:]:
+        if arg.startswith('--inputs='):
+            inputs_directory = arg.split('=', 1)[1]
+        elif arg.startswith('--output-dir='):
+            output_directory = arg.split('=', 1)[1]
+        elif arg.startswith('--jobs='):
+            workers = int(arg.split('=', 1)[1])
+        elif arg in ('-O', '--optimize'):
+            options['optimize'] = True
+        elif arg == '--codegen':
+            options['codegen'] = True
+        elif arg.startswith('base-assign'):
+            options['base_assign'] = int(arg.split('=')[1])
+        elif arg.startswith('base-input'):
+            options['base_input'] = int(arg.split('=')[1])
+        elif arg.startswith('base-output'):
+            options['base_output'] = int(arg.split('=')[1])
+        else:
+            patterns.append(arg)
+
+    if output_directory is not None:
+        os.makedirs(output_directory, exist_ok=True)
+
+    start = time.perf_counter()
+    results = []
+    for result in run_batch(expand(patterns), dialect, inputs_directory, workers, **options):
+        program_file, output, error, _ = result
+        results.append(result)
+        if output_directory is not None:
+            stem = os.path.splitext(os.path.basename(program_file))[0]
+            with open(os.path.join(output_directory, stem + OUTPUT_SUFFIX), 'w') as file:
+                file.write(output)
+        else:
+            sys.stdout.write(f'==> {program_file} <==\n{output}')
+    sys.stderr.write(summary(results, time.perf_counter() - start))
+    if any(result[2] is not None for result in results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
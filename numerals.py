@@ -0,0 +1,177 @@
+import re
+import threading
+
+from output import to_base
+
+DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+MIN_BASE = 2
+MAX_BASE = 36
+ROMAN_LIMIT = 3999
+ROMAN_DIGITS = (
+    ('M', 1000), ('CM', 900), ('D', 500), ('CD', 400),
+    ('C', 100), ('XC', 90), ('L', 50), ('XL', 40),
+    ('X', 10), ('IX', 9), ('V', 5), ('IV', 4), ('I', 1),
+)
+FORMATS = ('base', 'roman', 'zeckendorf')
+
+_patterns = {}
+_roman_values = {}
+_roman_texts = ['']
+_fibs = [1, 2]
+_fib_index = {1: 0, 2: 1}
+_lock = threading.Lock()
+
+
+def check_base(base):
+    if not MIN_BASE <= base <= MAX_BASE:
+        raise ValueError(f"Недопустимое основание системы счисления: {base}")
+
+
+def number_patterns(base):
+    patterns = _patterns.get(base)
+    if patterns is None:
+        check_base(base)
+        digits = DIGITS[:base]
+        number = f'[+-]?[{digits}{digits.lower()}]+'
+        patterns = (re.compile(number), re.compile(f'(?:{number}\n)*{number}'))
+        _patterns[base] = patterns
+    return patterns
+
+
+def decode(text, base=10):
+    text = text.strip()
+    if not number_patterns(base)[0].fullmatch(text):
+        raise ValueError(f"Недопустимое число в системе с основанием {base}: {text!r}")
+    return int(text, base)
+
+
+def decode_many(texts, base=10):
+    texts = [text.strip() for text in texts]
+    if texts and not number_patterns(base)[1].fullmatch('\n'.join(texts)):
+        for text in texts:
+            decode(text, base)
+    return [int(text, base) for text in texts]
+
+
+def encode(value, base=10):
+    check_base(base)
+    return to_base(value, base)
+
+
+def encode_many(values, base=10):
+    check_base(base)
+    return [encode(value, base) for value in values]
+
+
+def roman_tables():
+    if len(_roman_texts) <= ROMAN_LIMIT:
+        with _lock:
+            for value in range(len(_roman_texts), ROMAN_LIMIT + 1):
+                parts = []
+                rest = value
+                for digits, amount in ROMAN_DIGITS:
+                    count, rest = divmod(rest, amount)
+                    parts.append(digits * count)
+                text = ''.join(parts)
+                _roman_values[text] = value
+                _roman_texts.append(text)
+    return _roman_values, _roman_texts
+
+
+def decode_roman(text):
+    values, _ = roman_tables()
+    value = values.get(text.strip().upper())
+    if value is None:
+        raise ValueError(f"Недопустимое римское число: {text!r}")
+    return value
+
+
+def decode_roman_many(texts):
+    return [decode_roman(text) for text in texts]
+
+
+def encode_roman(value):
+    _, texts = roman_tables()
+    if not 1 <= value <= ROMAN_LIMIT:
+        raise ValueError(f"Число {value} нельзя записать римскими цифрами")
+    return texts[value]
+
+
+def encode_roman_many(values):
+    return [encode_roman(value) for value in values]
+
+
+def fibonacci(limit):
+    if _fibs[-1] < limit:
+        with _lock:
+            while _fibs[-1] < limit:
+                _fib_index[_fibs[-1] + _fibs[-2]] = len(_fibs)
+                _fibs.append(_fibs[-1] + _fibs[-2])
+    return _fibs
+
+
+def decode_zeckendorf(terms):
+    if isinstance(terms, str):
+        terms = terms.split()
+    try:
+        terms = [int(term) if isinstance(term, str) else term for term in terms]
+    except ValueError:
+        raise ValueError(f"Недопустимое цекендорфово представление: {' '.join(map(str, terms))}") from None
+    if not terms:
+        raise ValueError("Пустое цекендорфово представление")
+    fibonacci(max(terms))
+    indices = set()
+    for term in terms:
+        index = _fib_index.get(term)
+        if index is None or index in indices or index - 1 in indices or index + 1 in indices:
+            raise ValueError(f"Недопустимое цекендорфово представление: {' '.join(map(str, terms))}")
+        indices.add(index)
+    return sum(terms)
+
+
+def decode_zeckendorf_many(lines):
+    return [decode_zeckendorf(line) for line in lines]
+
+
+def encode_zeckendorf(value):
+    if value < 1:
+        raise ValueError(f"Число {value} не имеет цекендорфова представления")
+    fibs = fibonacci(value)
+    terms = []
+    index = len(fibs) - 1
+    while value:
+        while fibs[index] > value:
+            index -= 1
+        terms.append(fibs[index])
+        value -= fibs[index]
+        index -= 2
+    return terms
+
+
+def encode_zeckendorf_many(values):
+    return [encode_zeckendorf(value) for value in values]
+
+
+def decode_values(text, format='base', base=10):
+    if format == 'base':
+        return decode_many(text.split(), base)
+    if format == 'roman':
+        return decode_roman_many(text.split())
+    if format == 'zeckendorf':
+        return decode_zeckendorf_many(line for line in text.splitlines() if line.strip())
+    raise ValueError(f"Неизвестный формат значений: {format}")
+
+
+def encode_values(values, format='base', base=10):
+    if format == 'base':
+        return '\n'.join(encode_many(values, base))
+    if format == 'roman':
+        return '\n'.join(encode_roman_many(values))
+    if format == 'zeckendorf':
+        return '\n'.join(' '.join(map(str, terms)) for terms in encode_zeckendorf_many(values))
+    raise ValueError(f"Неизвестный формат значений: {format}")
+
+
+def read_values(path, format='base', base=10):
+    with open(path, 'r') as file:
+        return decode_values(file.read(), format, base)
@@ -0,0 +1,215 @@
+from frontend import Number, Variable, UnaryOp, BinaryOp, Assign, Input, Output, ExprStatement, TEMP_PREFIX
+from evaluator import BINARY_OPERATIONS, UNARY_OPERATIONS
+
+
+def fold(node):
+    kind = type(node)
+    if kind is BinaryOp:
+        left = fold(node.left)
+        right = fold(node.right)
+        if type(left) is Number and type(right) is Number:
+            try:
+                return Number(BINARY_OPERATIONS[node.op](left.value, right.value))
+            except ZeroDivisionError:
+                pass
+        return BinaryOp(node.op, left, right)
+    if kind is UnaryOp:
+        operand = fold(node.operand)
+        if type(operand) is Number:
+            return Number(UNARY_OPERATIONS[node.op](operand.value))
+        return UnaryOp(node.op, operand)
+    return node
+
+
+def reads(node, names):
+    kind = type(node)
+    if kind is Variable:
+        names.add(node.name)
+    elif kind is BinaryOp:
+        reads(node.left, names)
+        reads(node.right, names)
+    elif kind is UnaryOp:
+        reads(node.operand, names)
+    return names
+
+
+def can_fail(node, defined):
+    kind = type(node)
+    if kind is Variable:
+        return node.name not in defined
+    if kind is BinaryOp:
+        if node.op in ('div', 'rem') and not (type(node.right) is Number and node.right.value):
+            return True
+        return can_fail(node.left, defined) or can_fail(node.right, defined)
+    if kind is UnaryOp:
+        return can_fail(node.operand, defined)
+    return False
+
+
+def copy_statement(statement, **changes):
+    kind = type(statement)
+    if kind is Assign:
+        result = Assign(statement.target, changes.get('expr', statement.expr))
+    elif kind is Input:
+        result = Input(statement.target)
+    elif kind is Output:
+        result = Output(changes.get('expr', statement.expr), statement.label)
+    else:
+        result = ExprStatement(changes.get('expr', statement.expr))
+    result.line = statement.line
+    result.breakpoint = statement.breakpoint
+    result.condition = statement.condition
+    return result
+
+
+def fold_constants(statements):
+    return [statement if type(statement) in (Input, Output) else copy_statement(statement, expr=fold(statement.expr))
+            for statement in statements]
+
+
+def eliminate_dead(statements, defined=(), live_out=None):
+    defined = set(defined)
+    failing = []
+    for statement in statements:
+        failing.append(type(statement) is not Input and can_fail(statement.expr, defined))
+        if type(statement) in (Assign, Input):
+            defined.add(statement.target)
+
+    if live_out is None:
+        live = set(defined)
+    else:
+        live = set(live_out)
+    result = []
+    for statement, fails in zip(reversed(statements), reversed(failing)):
+        kind = type(statement)
+        if kind is Assign:
+            if statement.target not in live and not fails and not statement.breakpoint:
+                continue
+            live.discard(statement.target)
+        elif kind is Input:
+            live.discard(statement.target)
+        elif kind is ExprStatement and not fails and not statement.breakpoint:
+            continue
+        if kind is not Input:
+            reads(statement.expr, live)
+        result.append(statement)
+    result.reverse()
+    return result
+
+
+class CommonSubexpressions:
+    def __init__(self, statements, defined=()):
+        self.statements = statements
+        self.names = set()
+        for statement in statements:
+            if type(statement) is not Input:
+                reads(statement.expr, self.names)
+            if type(statement) in (Assign, Input):
+                self.names.add(statement.target)
+        self.counter = 0
+        self.initial = set(defined)
+        self.defined = set(defined)
+        self.unsafe = False
+
+    def key(self, node, versions):
+        kind = type(node)
+        if kind is Number:
+            return node.value
+        if kind is Variable:
+            return (node.name, versions.get(node.name))
+        if kind is UnaryOp:
+            return (node.op, self.key(node.operand, versions))
+        return (node.op, self.key(node.left, versions), self.key(node.right, versions))
+
+    def count(self, node, versions, counts):
+        if type(node) not in (BinaryOp, UnaryOp):
+            return
+        key = self.key(node, versions)
+        if key in counts:
+            counts[key] += 1
+            return
+        counts[key] = 1
+        if type(node) is BinaryOp:
+            self.count(node.left, versions, counts)
+            self.count(node.right, versions, counts)
+        else:
+            self.count(node.operand, versions, counts)
+
+    def temp(self):
+        while True:
+            self.counter += 1
+            name = TEMP_PREFIX + str(self.counter)
+            if name not in self.names:
+                return name
+
+    def rewrite(self, node, versions, counts, temps, hoisted):
+        if type(node) not in (BinaryOp, UnaryOp):
+            if can_fail(node, self.defined):
+                self.unsafe = True
+            return node
+        key = self.key(node, versions)
+        if key in temps:
+            return Variable(temps[key])
+        unsafe = self.unsafe
+        if type(node) is BinaryOp:
+            node = BinaryOp(node.op,
+                            self.rewrite(node.left, versions, counts, temps, hoisted),
+                            self.rewrite(node.right, versions, counts, temps, hoisted))
+        else:
+            node = UnaryOp(node.op, self.rewrite(node.operand, versions, counts, temps, hoisted))
+        if counts.get(key, 0) > 1 and not unsafe:
+            name = self.temp()
+            temps[key] = name
+            hoisted.append(Assign(name, node))
+            self.unsafe = False
+            self.defined.add(name)
+            return Variable(name)
+        if can_fail(node, self.defined):
+            self.unsafe = True
+        return node
+
+    def walk(self, visit):
+        versions = {}
+        self.defined = set(self.initial)
+        for index, statement in enumerate(self.statements):
+            if statement.breakpoint:
+                versions = {name: (index, 'debug') for name in self.names}
+            visit(statement, versions)
+            if type(statement) in (Assign, Input):
+                versions[statement.target] = index
+                self.defined.add(statement.target)
+
+    def run(self):
+        counts = {}
+
+        def count(statement, versions):
+            if type(statement) not in (Input, Output):
+                self.count(statement.expr, versions, counts)
+
+        self.walk(count)
+        if all(value == 1 for value in counts.values()):
+            return self.statements
+
+        result = []
+        temps = {}
+
+        def rewrite(statement, versions):
+            if type(statement) in (Input, Output):
+                result.append(statement)
+                return
+            self.unsafe = False
+            hoisted = []
+            expr = self.rewrite(statement.expr, versions, counts, temps, hoisted)
+            for temp in hoisted:
+                temp.line = statement.line
+            result.extend(hoisted)
+            result.append(copy_statement(statement, expr=expr))
+
+        self.walk(rewrite)
+        return result
+
+
+def optimize(statements, defined=(), live_out=None):
+    statements = fold_constants(statements)
+    statements = eliminate_dead(statements, defined, live_out)
+    return CommonSubexpressions(statements, defined).run()
@@ -0,0 +1,104 @@
+import sys
+import threading
+
+DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+CHUNK_LIMIT = 4096
+SPLIT_BITS = 4096
+BUFFER_SIZE = 1 << 16
+
+_chunks = {}
+_powers = {}
+_lock = threading.Lock()
+
+
+def chunk_table(base):
+    table = _chunks.get(base)
+    if table is None:
+        width = 1
+        while base ** (width + 1) <= CHUNK_LIMIT:
+            width += 1
+        digits = DIGITS[:base]
+        chunks = list(digits)
+        for _ in range(width - 1):
+            chunks = [head + digit for head in chunks for digit in digits]
+        table = (width, base ** width, chunks)
+        _chunks[base] = table
+    return table
+
+
+def power_table(base, num):
+    powers = _powers.get(base)
+    if powers is None or powers[-1][0] * powers[-1][0] <= num:
+        with _lock:
+            powers = _powers.get(base)
+            if powers is None:
+                width, size, _ = chunk_table(base)
+                powers = [(size, width)]
+                _powers[base] = powers
+            while powers[-1][0] * powers[-1][0] <= num:
+                power, width = powers[-1]
+                powers.append((power * power, width * 2))
+    return powers
+
+
+def small_to_base(num, base):
+    if base == 10:
+        return str(num)
+    width, size, chunks = chunk_table(base)
+    parts = []
+    while num >= size:
+        num, chunk = divmod(num, size)
+        parts.append(chunks[chunk])
+    parts.append(chunks[num].lstrip('0') or '0')
+    parts.reverse()
+    return ''.join(parts)
+
+
+def large_to_base(num, base, powers, level, digits):
+    if num.bit_length() <= SPLIT_BITS:
+        text = small_to_base(num, base)
+        return text.rjust(digits, '0')
+    while powers[level][0] > num:
+        level -= 1
+    power, width = powers[level]
+    high, low = divmod(num, power)
+    return (large_to_base(high, base, powers, level, max(digits - width, 0)) +
+            large_to_base(low, base, powers, level - 1, width))
+
+
+def to_base(num, base):
+    if num < 0:
+        return '-' + to_base(-num, base)
+    if base == 16:
+        return format(num, 'X')
+    if base == 2:
+        return format(num, 'b')
+    if base == 8:
+        return format(num, 'o')
+    if num.bit_length() <= SPLIT_BITS:
+        return small_to_base(num, base)
+    powers = power_table(base, num)
+    return large_to_base(num, base, powers, len(powers) - 1, 0)
+
+
+class OutputSink:
+    def __init__(self, stream=None, buffer_size=BUFFER_SIZE):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.parts = []
+        self.size = 0
+
+    def write(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if not self.parts:
+            return
+        stream = self.stream if self.stream is not None else sys.stdout
+        stream.write(''.join(self.parts))
+        stream.flush()
+        self.parts.clear()
+        self.size = 0
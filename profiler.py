@@ -0,0 +1,105 @@
+import json
+import sys
+import time
+
+REPORT_LIMIT = 20
+
+
+def record(table, key, elapsed):
+    entry = table.get(key)
+    if entry is None:
+        table[key] = [1, elapsed]
+    else:
+        entry[0] += 1
+        entry[1] += elapsed
+
+
+class Profiler:
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.statements = {}
+        self.operators = {}
+        self.lookups = {}
+        self.interpreter = None
+        self.started = None
+        self.finished = None
+
+    def timed(self, function, table, key=None):
+        clock = self.clock
+
+        def wrapper(*args):
+            start = clock()
+            try:
+                return function(*args)
+            finally:
+                record(table, args[0] if key is None else key, clock() - start)
+        return wrapper
+
+    def attach(self, interpreter):
+        evaluator = interpreter.evaluator
+        evaluator.binary = {op: self.timed(operation, self.operators, op)
+                            for op, operation in evaluator.binary.items()}
+        evaluator.unary = {op: self.timed(operation, self.operators, op)
+                           for op, operation in evaluator.unary.items()}
+        interpreter.execute_command = self.timed(interpreter.execute_command, self.operators)
+        interpreter.variables.search = self.timed(interpreter.variables.search, self.lookups)
+        interpreter.run_statement = self.timed(interpreter.run_statement, self.statements)
+        self.interpreter = interpreter
+        self.started = self.clock()
+        return self
+
+    def stop(self):
+        if self.finished is None:
+            self.finished = self.clock()
+
+    def rows(self):
+        formatter = self.interpreter.formatter()
+        statements = [{'line': statement.line, 'text': formatter.statement(statement),
+                       'calls': calls, 'seconds': seconds}
+                      for statement, (calls, seconds) in self.statements.items()]
+        operators = [{'operator': op, 'calls': calls, 'seconds': seconds}
+                     for op, (calls, seconds) in self.operators.items()]
+        lookups = [{'variable': name, 'calls': calls, 'seconds': seconds}
+                   for name, (calls, seconds) in self.lookups.items()]
+        for table in (statements, operators, lookups):
+            table.sort(key=lambda row: row['seconds'], reverse=True)
+        return statements, operators, lookups
+
+    def to_dict(self):
+        self.stop()
+        statements, operators, lookups = self.rows()
+        return {
+            'total_seconds': self.finished - self.started,
+            'statements': statements,
+            'operators': operators,
+            'lookups': lookups,
+        }
+
+    def write(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.to_dict(), file, indent=2, ensure_ascii=False)
+
+    def report(self, stream=None, limit=REPORT_LIMIT):
+        stream = stream if stream is not None else sys.stderr
+        profile = self.to_dict()
+        total = profile['total_seconds'] or 1e-12
+        lines = [f'Профиль выполнения: {profile["total_seconds"] * 1000:.3f} мс']
+        sections = (
+            ('Операторы программы', 'statements', lambda row: f'строка {row["line"]}: {row["text"]}'),
+            ('Операции', 'operators', lambda row: row['operator']),
+            ('Поиск переменных', 'lookups', lambda row: row['variable']),
+        )
+        for title, name, describe in sections:
+            rows = profile[name]
+            if not rows:
+                continue
+            lines.append('')
+            lines.append(f'{title}:')
+            lines.append(f'{"мс":>10} {"%":>6} {"вызовы":>8}')
+            for row in rows[:limit]:
+                lines.append(f'{row["seconds"] * 1000:10.3f} {row["seconds"] / total:6.1%} {row["calls"]:8}  '
+                             f'{describe(row)}')
+            if len(rows) > limit:
+                lines.append(f'... ещё {len(rows) - limit}')
+        stream.write('\n'.join(lines) + '\n')
+        stream.flush()
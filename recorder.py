@@ -0,0 +1,363 @@
+import mmap
+import os
+from operator import attrgetter
+import struct
+import sys
+from bisect import bisect_right
+
+from frontend import Assign, Input
+from output import to_base
+
+MAGIC = b'LAB1TRCE'
+TRAILER_MAGIC = b'LAB1TEND'
+TRACE_VERSION = 2
+TRACE_SUFFIX = '.trace'
+TRACE_FILE = 'program.trace'
+HEADER = struct.Struct('<8sHB5x')
+NAME = struct.Struct('<BI')
+BLOCK = struct.Struct('<BII')
+EXCEPTION = struct.Struct('<IB')
+SNAPSHOT = struct.Struct('<BQQ')
+ENTRY = struct.Struct('<IBq')
+INDEX = struct.Struct('<BQQ')
+INDEX_ENTRY = struct.Struct('<QQ')
+TRAILER = struct.Struct('<Q8s')
+BIG_SIZE = struct.Struct('<I')
+TAG_NAME, TAG_BLOCK, TAG_SNAPSHOT, TAG_INDEX, TAG_DELTA = b'NBSXD'
+MISSING = 1
+BIG = 2
+LOW = -1 << 63
+HIGH = 1 << 63
+SNAPSHOT_INTERVAL = 1 << 16
+BUFFER_SIZE = 1 << 20
+LOG_SIZE = 1 << 12
+RECORDED = (Assign, Input)
+TARGET = attrgetter('target')
+
+
+def trace_path(program_file):
+    if program_file == '-':
+        return TRACE_FILE
+    return program_file + TRACE_SUFFIX
+
+
+def pack_value(value):
+    if value is None:
+        return MISSING, 0, b''
+    if LOW <= value < HIGH:
+        return 0, value, b''
+    size = (value.bit_length() + 8) // 8
+    return BIG, 0, BIG_SIZE.pack(size) + value.to_bytes(size, 'little', signed=True)
+
+
+def unpack_big(buffer, pos):
+    size, = BIG_SIZE.unpack_from(buffer, pos)
+    pos += BIG_SIZE.size
+    return int.from_bytes(buffer[pos:pos + size], 'little', signed=True), pos + size
+
+
+class Recorder:
+    def __init__(self, path, interval=SNAPSHOT_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.file = None
+        self.buffer = bytearray()
+        self.log = []
+        self.written = 0
+        self.names = {}
+        self.snapshots = []
+        self.pending = 0
+        self.threshold = interval
+        self.interpreter = None
+        self.variables = None
+
+    def attach(self, interpreter):
+        self.file = open(self.path, 'wb')
+        self.buffer += HEADER.pack(MAGIC, TRACE_VERSION, interpreter.base_output)
+        self.interpreter = interpreter
+        self.variables = interpreter.variables
+        self.snapshot(interpreter.position)
+        return self
+
+    def run(self, statements, start=0):
+        interpreter = self.interpreter
+        run_statement = interpreter.run_statement
+        values = []
+        record = values.append
+        end = len(statements)
+        low = index = start
+        try:
+            for low in range(start, end, LOG_SIZE):
+                for index in range(low, min(low + LOG_SIZE, end)):
+                    statement = statements[index]
+                    value = run_statement(statement)
+                    if type(statement) in RECORDED:
+                        record(value)
+                index += 1
+                self.record(statements, low, index, values)
+                values.clear()
+        finally:
+            interpreter.position = index
+            if values:
+                self.record(statements, low, index, values)
+
+    def record(self, statements, low, high, values):
+        chunk = statements[low:high]
+        if len(chunk) == len(values):
+            steps = range(low, high)
+        else:
+            steps = [step for step, statement in enumerate(chunk, low) if type(statement) in RECORDED]
+            chunk = [statements[step] for step in steps]
+        self.block(steps, list(map(TARGET, chunk)), values)
+        if self.pending >= self.threshold:
+            self.snapshot(high)
+
+    def changed(self, name, value):
+        step = self.interpreter.position
+        log = self.log
+        if self.pending + len(log) >= self.threshold:
+            self.snapshot(step)
+        log.append((step, name, value))
+        if len(log) >= LOG_SIZE:
+            self.pack()
+
+    def pack(self):
+        log = self.log
+        if log:
+            steps, targets, values = zip(*log)
+            log.clear()
+            self.block(steps, targets, values)
+
+    def block(self, steps, targets, values):
+        count = len(values)
+        table = self.names
+        indices = list(map(table.get, targets))
+        if None in indices:
+            indices = [table[name] if name in table else self.name(name) for name in targets]
+        exceptions = []
+        try:
+            column = struct.pack(f'<{count}q', *values)
+        except struct.error:
+            values = list(values)
+            for position, value in enumerate(values):
+                if value is None or not LOW <= value < HIGH:
+                    exceptions.append((position, value))
+                    values[position] = 0
+            column = struct.pack(f'<{count}q', *values)
+        buffer = self.buffer
+        buffer += BLOCK.pack(TAG_BLOCK, count, len(exceptions))
+        buffer += struct.pack(f'<{count}Q', *steps)
+        buffer += struct.pack(f'<{count}I', *indices)
+        buffer += column
+        for position, value in exceptions:
+            flags, _, big = pack_value(value)
+            buffer += EXCEPTION.pack(position, flags)
+            buffer += big
+        self.pending += count
+        if len(buffer) >= BUFFER_SIZE:
+            self.flush()
+
+    def name(self, name):
+        index = len(self.names)
+        self.names[name] = index
+        encoded = name.encode('utf-8')
+        self.buffer += NAME.pack(TAG_NAME, len(encoded))
+        self.buffer += encoded
+        return index
+
+    def snapshot(self, step):
+        self.pack()
+        self.snapshots.append((step, self.written + len(self.buffer)))
+        self.names = {}
+        items = list(self.variables.items())
+        buffer = self.buffer
+        buffer += SNAPSHOT.pack(TAG_SNAPSHOT, step, len(items))
+        for name, value in items:
+            self.names[name] = len(self.names)
+            encoded = name.encode('utf-8')
+            flags, small, big = pack_value(value)
+            buffer += ENTRY.pack(len(encoded), flags, small)
+            buffer += encoded
+            buffer += big
+        self.pending = 0
+        self.threshold = max(self.interval, len(items))
+        self.flush()
+
+    def flush(self):
+        self.file.write(self.buffer)
+        self.written += len(self.buffer)
+        self.buffer.clear()
+
+    def close(self):
+        if self.file is None:
+            return
+        self.pack()
+        offset = self.written + len(self.buffer)
+        self.buffer += INDEX.pack(TAG_INDEX, len(self.snapshots), self.interpreter.position)
+        for step, position in self.snapshots:
+            self.buffer += INDEX_ENTRY.pack(step, position)
+        self.buffer += TRAILER.pack(offset, TRAILER_MAGIC)
+        self.flush()
+        self.file.close()
+        self.file = None
+
+
+class Trace:
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.map) < HEADER.size:
+            raise ValueError("Некорректный файл трассы")
+        magic, version, self.base_output = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != TRACE_VERSION:
+            raise ValueError("Некорректный файл трассы")
+        self.snapshots = []
+        self.last_step = None
+        if len(self.map) >= HEADER.size + TRAILER.size:
+            offset, trailer = TRAILER.unpack_from(self.map, len(self.map) - TRAILER.size)
+            if trailer == TRAILER_MAGIC:
+                self.read_index(offset)
+        if self.last_step is None:
+            self.scan_index()
+        self.steps = [step for step, _ in self.snapshots]
+
+    def read_index(self, offset):
+        _, count, self.last_step = INDEX.unpack_from(self.map, offset)
+        offset += INDEX.size
+        for _ in range(count):
+            self.snapshots.append(INDEX_ENTRY.unpack_from(self.map, offset))
+            offset += INDEX_ENTRY.size
+
+    def scan_index(self):
+        step = 0
+        for record in self.records(HEADER.size):
+            if record[0] == TAG_SNAPSHOT:
+                self.snapshots.append((record[1], record[3]))
+                step = record[1]
+            elif record[0] == TAG_DELTA:
+                step = record[1] + 1
+        self.last_step = step
+
+    def records(self, offset):
+        buffer = self.map
+        end = len(buffer)
+        names = []
+        try:
+            while offset < end:
+                start = offset
+                tag = buffer[offset]
+                if tag == TAG_BLOCK:
+                    _, count, exceptional = BLOCK.unpack_from(buffer, offset)
+                    offset += BLOCK.size
+                    steps = struct.unpack_from(f'<{count}Q', buffer, offset)
+                    offset += 8 * count
+                    indices = struct.unpack_from(f'<{count}I', buffer, offset)
+                    offset += 4 * count
+                    values = list(struct.unpack_from(f'<{count}q', buffer, offset))
+                    offset += 8 * count
+                    for _ in range(exceptional):
+                        position, flags = EXCEPTION.unpack_from(buffer, offset)
+                        offset += EXCEPTION.size
+                        if flags & MISSING:
+                            values[position] = None
+                        elif flags & BIG:
+                            values[position], offset = unpack_big(buffer, offset)
+                    for k in range(count):
+                        yield TAG_DELTA, steps[k], names[indices[k]], values[k]
+                elif tag == TAG_NAME:
+                    _, size = NAME.unpack_from(buffer, offset)
+                    offset += NAME.size
+                    names.append(buffer[offset:offset + size].decode('utf-8'))
+                    offset += size
+                elif tag == TAG_SNAPSHOT:
+                    _, step, count = SNAPSHOT.unpack_from(buffer, offset)
+                    offset += SNAPSHOT.size
+                    names = []
+                    items = []
+                    for _ in range(count):
+                        size, flags, value = ENTRY.unpack_from(buffer, offset)
+                        offset += ENTRY.size
+                        name = buffer[offset:offset + size].decode('utf-8')
+                        offset += size
+                        if flags & BIG:
+                            value, offset = unpack_big(buffer, offset)
+                        names.append(name)
+                        items.append((name, value))
+                    yield TAG_SNAPSHOT, step, items, start
+                else:
+                    return
+        except (struct.error, IndexError, UnicodeDecodeError):
+            return
+
+    def state_at(self, step):
+        if not self.snapshots:
+            raise ValueError("Трасса не содержит снимков")
+        index = max(bisect_right(self.steps, step) - 1, 0)
+        variables = None
+        for record in self.records(self.snapshots[index][1]):
+            if record[0] == TAG_SNAPSHOT:
+                if variables is not None:
+                    break
+                variables = dict(record[2])
+            elif record[1] >= step:
+                break
+            elif record[3] is None:
+                variables.pop(record[2], None)
+            else:
+                variables[record[2]] = record[3]
+        return variables
+
+    def history(self, name):
+        current = None
+        for record in self.records(HEADER.size):
+            if record[0] == TAG_SNAPSHOT:
+                current = dict(record[2]).get(name)
+            elif record[2] == name and record[3] != current:
+                yield record[1], current, record[3]
+                current = record[3]
+
+    def close(self):
+        self.map.close()
+
+
+def main():
+    argv = sys.argv
+    if len(argv) < 2:
+        print("Usage: python recorder.py <trace_file> [--at=N] [--var=<name>] [--prefix=<prefix>]")
+        sys.exit(1)
+
+    trace = Trace(argv[1])
+    base = trace.base_output
+    at = None
+    name = None
+    prefix = ''
+    for arg in argv[2:]:
+        if arg.startswith('--at='):
+            at = int(arg.split('=', 1)[1])
+        elif arg.startswith('--var='):
+            name = arg.split('=', 1)[1]
+        elif arg.startswith('--prefix='):
+            prefix = arg.split('=', 1)[1]
+
+    try:
+        if name is not None:
+            for step, old, new in trace.history(name):
+                if at is not None and step >= at:
+                    break
+                old, new = ('—' if value is None else to_base(value, base) for value in (old, new))
+                print(f'[{step}] {name}: {old} -> {new}')
+        elif at is not None:
+            variables = trace.state_at(at)
+            print(f'Состояние перед оператором {at}:')
+            for key in sorted(variables):
+                if key.startswith(prefix):
+                    print(f'{key} = {to_base(variables[key], base)}')
+        else:
+            print(f'Операторов: {trace.last_step}, снимков: {len(trace.snapshots)}, '
+                  f'размер: {os.path.getsize(argv[1])} байт')
+    finally:
+        trace.close()
+
+
+if __name__ == '__main__':
+    main()
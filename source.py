@@ -0,0 +1,191 @@
+import codecs
+import mmap
+import os
+import re
+
+from lexer import ParseError
+
+CHUNK_SIZE = 1 << 16
+SPECIAL = re.compile(r'[\[\];#\n]')
+BRACKETS = re.compile(r'[\[\]]')
+BREAKPOINT = 'BREAKPOINT'
+CONDITION = re.compile(r'\s+if\s+(.+)', re.S)
+
+
+class StatementScanner:
+    def __init__(self):
+        self.depth = 0
+        self.in_comment = False
+        self.comment = ''
+        self.parts = []
+        self.line = 1
+        self.start_line = 1
+        self.start_column = 1
+        self.breakpoint = False
+        self.offset = 0
+        self.line_start = 0
+        self.opened = None
+        self.comment_line = 1
+        self.comment_column = 1
+
+    def feed(self, chunk):
+        statements = []
+        parts = self.parts
+        pos = 0
+        for match in SPECIAL.finditer(chunk):
+            ch = match.group()
+            start = match.start()
+            if self.in_comment:
+                if self.keep_comment():
+                    self.comment += chunk[pos:start] if ch in '\n;' else chunk[pos:match.end()]
+                if ch == '\n':
+                    self.end_comment()
+                    parts.append(ch)
+                    self.newline(match.end())
+                elif ch == ';':
+                    self.end_comment()
+                    statements.append(self.emit())
+                    self.start_line = self.line
+                    self.start_column = self.column(match.end())
+            elif self.depth:
+                if ch == '\n':
+                    parts.append(ch)
+                    self.newline(match.end())
+                else:
+                    parts.append(' ' * (match.end() - pos))
+                    if ch == '[':
+                        self.depth += 1
+                    elif ch == ']':
+                        self.depth -= 1
+            else:
+                parts.append(chunk[pos:start])
+                if ch == ';':
+                    statements.append(self.emit())
+                    self.start_line = self.line
+                    self.start_column = self.column(match.end())
+                elif ch == '[':
+                    parts.append(' ')
+                    self.depth = 1
+                    self.opened = (self.line, self.column(start))
+                elif ch == '#':
+                    self.in_comment = True
+                    self.comment = ''
+                    self.comment_line = self.line
+                    self.comment_column = self.column(match.end())
+                elif ch == '\n':
+                    parts.append(ch)
+                    self.newline(match.end())
+                else:
+                    parts.append(ch)
+            pos = match.end()
+
+        if self.in_comment:
+            if self.keep_comment():
+                self.comment += chunk[pos:]
+        elif self.depth:
+            parts.append(' ' * (len(chunk) - pos))
+        else:
+            parts.append(chunk[pos:])
+        self.offset += len(chunk)
+        return [statement for statement in statements if statement is not None]
+
+    def column(self, pos):
+        return self.offset + pos - self.line_start + 1
+
+    def newline(self, end):
+        self.line += 1
+        self.line_start = self.offset + end
+
+    def keep_comment(self):
+        return len(self.comment) < len(BREAKPOINT) or self.comment.startswith(BREAKPOINT)
+
+    def end_comment(self):
+        if self.comment.startswith(BREAKPOINT):
+            condition = CONDITION.fullmatch(self.comment, len(BREAKPOINT))
+            if condition:
+                self.breakpoint = (condition.group(1).rstrip(), self.comment_line,
+                                   self.comment_column + condition.start(1))
+            elif not self.breakpoint:
+                self.breakpoint = True
+        self.in_comment = False
+        self.comment = ''
+
+    def emit(self):
+        text = ''.join(self.parts)
+        self.parts.clear()
+        breakpoint = self.breakpoint
+        self.breakpoint = False
+        if text.strip():
+            return text, self.start_line, self.start_column, breakpoint
+        return None
+
+    def close(self):
+        if self.depth:
+            line, column = self.opened
+            raise ParseError("Незакрытый комментарий '['", line, column)
+        if self.in_comment:
+            self.end_comment()
+        statement = self.emit()
+        if statement is None:
+            return []
+        return [statement]
+
+
+def strip_nested_comments(text):
+    if '[' not in text:
+        return text
+    result = []
+    opened = []
+    pos = 0
+    for match in BRACKETS.finditer(text):
+        result.append(text[pos:match.start()])
+        if match.group() == '[':
+            opened.append(len(result))
+            result.append('[')
+        elif opened:
+            del result[opened.pop():]
+        else:
+            result.append(']')
+        pos = match.end()
+    result.append(text[pos:])
+    return ''.join(result)
+
+
+def scan(source):
+    statements = []
+    breakpoints = {}
+    for text, line, column, breakpoint in read_statements([source]):
+        if breakpoint:
+            breakpoints[len(statements)] = breakpoint
+        statements.append((text, line, column))
+    return statements, breakpoints
+
+
+def read_chunks(stream, chunk_size=CHUNK_SIZE):
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def read_mmap_chunks(path, chunk_size=CHUNK_SIZE, encoding='utf-8'):
+    decoder = codecs.getincrementaldecoder(encoding)()
+    with open(path, 'rb') as file:
+        if not os.fstat(file.fileno()).st_size:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for offset in range(0, len(mapped), chunk_size):
+                chunk = decoder.decode(mapped[offset:offset + chunk_size])
+                if chunk:
+                    yield chunk
+    chunk = decoder.decode(b'', final=True)
+    if chunk:
+        yield chunk
+
+
+def read_statements(chunks):
+    scanner = StatementScanner()
+    for chunk in chunks:
+        yield from scanner.feed(chunk)
+    yield from scanner.close()
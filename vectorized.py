@@ -0,0 +1,152 @@
+import csv
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from output import to_base
+from numerals import decode_many
+from frontend import Number, Variable, UnaryOp, BinaryOp, Assign, Input, Output
+
+UINT64_MAX = 0xFFFFFFFFFFFFFFFF
+
+
+def require_numpy():
+    if np is None:
+        raise RuntimeError("Пакетный режим требует установленного пакета numpy")
+
+
+def as_column(values):
+    column = np.asarray(values)
+    if column.dtype.kind not in 'ui':
+        raise ValueError("Недопустимый тип столбца: " + str(column.dtype))
+    if column.dtype.kind == 'i' and column.size and column.min() < 0:
+        raise ValueError("Отрицательные значения не поддерживаются")
+    return column.astype(np.uint64, copy=False)
+
+
+def batch_pow(base, exponent):
+    mask = np.uint64(0xFFFFFFFF)
+    base, exponent = np.broadcast_arrays(base & mask, exponent)
+    base = base.copy()
+    exponent = exponent.copy()
+    result = np.ones_like(base)
+    one = np.uint64(1)
+    while exponent.any():
+        odd = (exponent & one).astype(bool)
+        result[odd] = (result[odd] * base[odd]) & mask
+        base = (base * base) & mask
+        exponent >>= one
+    return result
+
+
+def batch_divisor(b, message="integer division or modulo by zero"):
+    if np.any(b == 0):
+        raise ZeroDivisionError(message)
+    return b
+
+
+def build_operations():
+    mask = np.uint64(0xFFFFFFFF)
+    return {
+        'add': lambda a, b: (a + b) & mask,
+        'mult': lambda a, b: (a * b) & mask,
+        'sub': lambda a, b: (a - b) & mask,
+        'div': lambda a, b: a // batch_divisor(b),
+        'rem': lambda a, b: a % batch_divisor(b, "integer modulo by zero"),
+        'xor': lambda a, b: a ^ b,
+        'and': lambda a, b: a & b,
+        'or': lambda a, b: a | b,
+        'pow': batch_pow,
+    }
+
+
+class BatchEvaluator:
+    def __init__(self, columns):
+        require_numpy()
+        self.columns = {name: as_column(values) for name, values in columns.items()}
+        sizes = {column.shape[0] for column in self.columns.values()}
+        if len(sizes) > 1:
+            raise ValueError("Столбцы входных данных имеют разную длину")
+        self.size = sizes.pop() if sizes else 1
+        self.variables = {}
+        self.operations = build_operations()
+
+    def evaluate(self, node):
+        kind = type(node)
+        if kind is Number:
+            if node.value > UINT64_MAX:
+                raise ValueError("Значение не помещается в 64 бита: " + str(node.value))
+            return np.uint64(node.value)
+        if kind is Variable:
+            value = self.variables.get(node.name)
+            if value is None:
+                raise ValueError("Недопустимый токен: " + node.name)
+            return value
+        if kind is BinaryOp:
+            with np.errstate(over='ignore'):
+                return self.operations[node.op](self.evaluate(node.left), self.evaluate(node.right))
+        if kind is UnaryOp:
+            return ~self.evaluate(node.operand) & np.uint64(0xFFFFFFFF)
+        raise ValueError("Недопустимое выражение")
+
+    def run(self, statements):
+        outputs = []
+        for statement in statements:
+            kind = type(statement)
+            if kind is Assign:
+                self.variables[statement.target] = self.evaluate(statement.expr)
+            elif kind is Input:
+                if statement.target not in self.columns:
+                    raise ValueError("Нет входного столбца для переменной " + statement.target)
+                self.variables[statement.target] = self.columns[statement.target]
+            elif kind is Output:
+                value = self.evaluate(statement.expr)
+                outputs.append((statement.label, np.broadcast_to(value, (self.size,))))
+            else:
+                self.evaluate(statement.expr)
+        return outputs
+
+
+def format_column(column, base):
+    if base == 10:
+        return column.astype(str)
+    return [to_base(int(value), base) for value in column]
+
+
+def read_columns(path, base_input=10):
+    require_numpy()
+    if path.endswith('.npz'):
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+    with open(path, newline='') as file:
+        reader = csv.reader(file)
+        names = [name.strip() for name in next(reader)]
+        rows = [row for row in reader if row]
+    if not rows:
+        return {name: np.zeros(0, dtype=np.uint64) for name in names}
+    if any(len(row) != len(names) for row in rows):
+        raise ValueError("Строки файла входных данных имеют разную длину")
+    values = decode_many([value for row in rows for value in row], base_input)
+    if min(values) < 0:
+        raise ValueError("Отрицательные значения не поддерживаются")
+    table = np.array(values, dtype=np.uint64).reshape(len(rows), len(names))
+    return {name: table[:, i] for i, name in enumerate(names)}
+
+
+def write_csv(file, outputs, base_output=10):
+    writer = csv.writer(file)
+    writer.writerow([label for label, _ in outputs])
+    writer.writerows(zip(*[format_column(column, base_output) for _, column in outputs]))
+
+
+def write_outputs(path, outputs, base_output=10):
+    require_numpy()
+    if path.endswith('.npy'):
+        if not outputs:
+            raise ValueError("Программа ничего не выводит")
+        np.save(path, np.column_stack([column for _, column in outputs]))
+        return
+    with open(path, 'w', newline='') as file:
+        write_csv(file, outputs, base_output)